@@ -10,6 +10,8 @@ from datetime import datetime, UTC
 from typing import Optional, List, Dict, Any
 import hashlib
 
+from pymongo import UpdateOne
+
 import analytiq_data as ad
 
 logger = logging.getLogger(__name__)
@@ -58,6 +60,38 @@ async def get_embedding_from_cache(
     return None
 
 
+async def get_embeddings_from_cache(
+    analytiq_client,
+    chunk_hashes: List[str],
+    embedding_model: str
+) -> Dict[str, List[float]]:
+    """
+    Retrieve cached embeddings for many chunks in one query.
+    
+    Args:
+        analytiq_client: The analytiq client
+        chunk_hashes: SHA-256 hashes of the chunk texts
+        embedding_model: LiteLLM embedding model string
+        
+    Returns:
+        Dict mapping chunk_hash to embedding for the hashes found in the cache
+    """
+    if not chunk_hashes:
+        return {}
+
+    db = analytiq_client.mongodb_async[analytiq_client.env]
+    cursor = db.embedding_cache.find(
+        {
+            "chunk_hash": {"$in": list(set(chunk_hashes))},
+            "embedding_model": embedding_model
+        },
+        {"_id": 0, "chunk_hash": 1, "embedding": 1}
+    )
+    found = {entry["chunk_hash"]: entry["embedding"] async for entry in cursor if entry.get("embedding")}
+    logger.debug(f"Cache lookup for {len(chunk_hashes)} chunks, model={embedding_model}: {len(found)} hits")
+    return found
+
+
 async def store_embedding_in_cache(
     analytiq_client,
     chunk_hash: str,
@@ -97,6 +131,42 @@ async def store_embedding_in_cache(
     logger.debug(f"Stored embedding in cache: chunk_hash={chunk_hash[:16]}..., model={embedding_model}")
 
 
+async def store_embeddings_in_cache(
+    analytiq_client,
+    embeddings_by_hash: Dict[str, List[float]],
+    embedding_model: str
+) -> None:
+    """
+    Store many embeddings in cache with a single unordered bulk upsert.
+    
+    Args:
+        analytiq_client: The analytiq client
+        embeddings_by_hash: Dict mapping chunk_hash to embedding vector
+        embedding_model: LiteLLM embedding model string
+    """
+    if not embeddings_by_hash:
+        return
+
+    db = analytiq_client.mongodb_async[analytiq_client.env]
+    now = datetime.now(UTC)
+    await db.embedding_cache.bulk_write(
+        [
+            UpdateOne(
+                {"chunk_hash": chunk_hash, "embedding_model": embedding_model},
+                {
+                    "$set": {"embedding": embedding, "created_at": now},
+                    "$setOnInsert": {"chunk_hash": chunk_hash, "embedding_model": embedding_model}
+                },
+                upsert=True
+            )
+            for chunk_hash, embedding in embeddings_by_hash.items()
+        ],
+        ordered=False
+    )
+    
+    logger.debug(f"Stored {len(embeddings_by_hash)} embeddings in cache, model={embedding_model}")
+
+
 async def ensure_embedding_cache_index(analytiq_client) -> None:
     """
     Ensure the embedding_cache collection has the required unique index.
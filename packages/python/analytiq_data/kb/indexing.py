@@ -4,6 +4,7 @@ Knowledge Base indexing logic.
 Handles chunking, embedding generation, caching, and atomic vector storage.
 """
 
+import asyncio
 import logging
 import math
 import os
@@ -13,6 +14,7 @@ from dataclasses import dataclass
 from datetime import datetime, UTC
 from typing import List, Dict, Any, Optional, Tuple
 from bson import ObjectId
+from bson.binary import Binary, BinaryVectorDtype
 import tiktoken
 import litellm
 import stamina
@@ -20,8 +22,8 @@ import stamina
 import analytiq_data as ad
 from .embedding_cache import (
     compute_chunk_hash,
-    get_embedding_from_cache,
-    store_embedding_in_cache
+    get_embeddings_from_cache,
+    store_embeddings_in_cache
 )
 from .errors import (
     is_retryable_embedding_error,
@@ -114,9 +116,16 @@ except ImportError:
 # Disabled chunker types (require sentence_transformers which is too large)
 DISABLED_CHUNKER_TYPES = ["semantic", "late", "sdpm"]
 
+# Non-OCR file types whose original blob is read directly for indexing
+TEXT_FILE_EXTENSIONS = frozenset({".txt", ".md"})
+TABULAR_FILE_EXTENSIONS = frozenset({".csv", ".xls", ".xlsx"})
+
 # Embedding batch size for LiteLLM API calls
 EMBEDDING_BATCH_SIZE = 100
 
+# Max embedding batches in flight per document (bounded to stay under provider rate limits)
+EMBEDDING_BATCH_CONCURRENCY = 4
+
 # SPU metering: one SPU covers up to this many embedding API calls (cache misses), then another SPU per block of N.
 # Example: 1000 misses -> ceil(1000 / 250) = 4 SPUs (at least ~2x raw API cost vs $0.05/SPU retail).
 EMBEDDINGS_PER_SPU = 250
@@ -129,6 +138,18 @@ def spus_for_kb_indexing_embedding_misses(cache_miss_count: int) -> int:
     return math.ceil(cache_miss_count / EMBEDDINGS_PER_SPU)
 
 
+def kb_vectors_binary_embeddings_enabled() -> bool:
+    """Whether new KB vectors store embeddings as packed float32 BSON vectors (``KB_VECTORS_BINARY_EMBEDDINGS``)."""
+    return os.environ.get("KB_VECTORS_BINARY_EMBEDDINGS", "false").lower() in ("1", "true", "yes")
+
+
+def encode_kb_embedding(embedding: List[float]) -> Any:
+    """Encode an embedding for storage in ``kb_vectors_*``: a double array by default, BinData float32 when enabled."""
+    if kb_vectors_binary_embeddings_enabled():
+        return Binary.from_vector(embedding, BinaryVectorDtype.FLOAT32)
+    return list(embedding)
+
+
 @dataclass
 class ExtractedIndexingText:
     """Text used for chunking plus optional per-page character offsets (1-based page numbers)."""
@@ -499,29 +520,33 @@ async def get_or_generate_embeddings(
         organization_id: Organization ID for SPU metering
         
     Returns:
-        Tuple of (embeddings list, cache_miss_count)
+        Tuple of (embeddings list, cache_miss_count); duplicate chunks count as one miss
     """
     if not chunks:
         return [], 0
     
     embeddings = []
     cache_misses = []
-    cache_miss_indices = []
+    # Repeated chunks (boilerplate headers, footers) share a hash: embed each distinct one once
+    cache_miss_indices_by_hash: Dict[str, List[int]] = {}
     
-    # Check cache for each chunk
+    # Check cache for all chunks in one query
+    cached_by_hash = await get_embeddings_from_cache(
+        analytiq_client,
+        [chunk.hash for chunk in chunks],
+        embedding_model
+    )
     for idx, chunk in enumerate(chunks):
-        cached_embedding = await get_embedding_from_cache(
-            analytiq_client,
-            chunk.hash,
-            embedding_model
-        )
+        cached_embedding = cached_by_hash.get(chunk.hash)
 
         if cached_embedding:
             embeddings.append(cached_embedding)
         else:
             embeddings.append(None)  # Placeholder
-            cache_misses.append(chunk.embedding_input if chunk.embedding_input else chunk.text)
-            cache_miss_indices.append(idx)
+            if chunk.hash not in cache_miss_indices_by_hash:
+                cache_miss_indices_by_hash[chunk.hash] = []
+                cache_misses.append(chunk.embedding_input if chunk.embedding_input else chunk.text)
+            cache_miss_indices_by_hash[chunk.hash].append(idx)
     
     # Generate embeddings for cache misses in batches
     if cache_misses:
@@ -541,28 +566,38 @@ async def get_or_generate_embeddings(
         # Get provider for SPU metering using the standard method
         provider = ad.llm.get_llm_model_provider(embedding_model)
         
-        # Process in batches
+        # Process in batches, a few in flight at once; gather() keeps results in batch order
+        sem = asyncio.Semaphore(EMBEDDING_BATCH_CONCURRENCY)
+
+        async def _embed_batch(batch: List[str]) -> Tuple[List[List[float]], float]:
+            async with sem:
+                return await generate_embeddings_batch(analytiq_client, batch, embedding_model)
+
+        batch_tasks = [
+            asyncio.create_task(_embed_batch(cache_misses[i:i + EMBEDDING_BATCH_SIZE]))
+            for i in range(0, len(cache_misses), EMBEDDING_BATCH_SIZE)
+        ]
+        try:
+            batch_results = await asyncio.gather(*batch_tasks)
+        except BaseException:
+            # Stop the remaining (paid) provider calls: a failed batch fails indexing,
+            # and SPU usage is only recorded once every batch has succeeded
+            for task in batch_tasks:
+                task.cancel()
+            await asyncio.gather(*batch_tasks, return_exceptions=True)
+            raise
         total_cost = 0.0
-        for i in range(0, len(cache_misses), EMBEDDING_BATCH_SIZE):
-            batch = cache_misses[i:i + EMBEDDING_BATCH_SIZE]
-            batch_embeddings, batch_cost = await generate_embeddings_batch(
-                analytiq_client,
-                batch,
-                embedding_model
-            )
+        for batch_embeddings, batch_cost in batch_results:
             generated_embeddings.extend(batch_embeddings)
             total_cost += batch_cost
         
-        # Store in cache and fill in embeddings list
-        for idx, (cache_miss_idx, embedding) in enumerate(zip(cache_miss_indices, generated_embeddings)):
-            chunk = chunks[cache_miss_idx]
-            await store_embedding_in_cache(
-                analytiq_client,
-                chunk.hash,
-                embedding_model,
-                embedding
-            )
-            embeddings[cache_miss_idx] = embedding
+        # Fill in embeddings list and store new entries in cache with one bulk write
+        new_cache_entries = {}
+        for (chunk_hash, indices), embedding in zip(cache_miss_indices_by_hash.items(), generated_embeddings):
+            new_cache_entries[chunk_hash] = embedding
+            for cache_miss_idx in indices:
+                embeddings[cache_miss_idx] = embedding
+        await store_embeddings_in_cache(analytiq_client, new_cache_entries, embedding_model)
         
         # Record SPU usage: ceil(cache_misses / EMBEDDINGS_PER_SPU) SPUs
         if cache_miss_count > 0:
@@ -592,6 +627,7 @@ async def get_extracted_indexing_text(
     document_id: str,
     *,
     preprocess: Optional[ChunkingPreprocessConfig] = None,
+    doc: Optional[Dict[str, Any]] = None,
 ) -> Optional[ExtractedIndexingText]:
     """
     Get extracted text from a document plus optional per-page character offsets.
@@ -599,10 +635,13 @@ async def get_extracted_indexing_text(
     For OCR with ``prefer_markdown``, builds markdown per page (exact page map). Otherwise
     preserves legacy behavior (single ``to_markdown()`` when tables exist, else ``get_text()``).
     Applies ``preprocess_markdown`` to final text for .txt/.md and plain OCR fallbacks.
+
+    Callers that already hold the ``docs`` row can pass it as ``doc`` to skip the lookup.
     """
     cfg = preprocess or ChunkingPreprocessConfig()
 
-    doc = await ad.common.doc.get_doc(analytiq_client, document_id)
+    if doc is None:
+        doc = await ad.common.doc.get_doc(analytiq_client, document_id)
     if not doc:
         return None
 
@@ -655,24 +694,22 @@ async def get_extracted_indexing_text(
         logger.info(f"{document_id}: Exporting OCR text for indexing")
         return ExtractedIndexingText(text=textract_doc.get_text(), page_offsets=[])
 
-    if file_name:
-        ext = os.path.splitext(file_name)[1].lower()
-        if ext in {".txt", ".md"}:
-            original_file = await ad.common.get_file_async(analytiq_client, doc["mongo_file_name"])
-            if original_file and original_file["blob"]:
-                logger.info(f"{document_id}: Exporting original file content for indexing")
-                try:
-                    raw = original_file["blob"].decode("utf-8")
-                except UnicodeDecodeError:
-                    raw = original_file["blob"].decode("latin-1")
-                return ExtractedIndexingText(text=preprocess_markdown(raw, cfg), page_offsets=[])
-
-        if ext in {".csv", ".xls", ".xlsx"}:
-            original_file = await ad.common.get_file_async(analytiq_client, doc["mongo_file_name"])
-            if original_file and original_file["blob"]:
-                table_md = _convert_tabular_file_to_markdown(ext, original_file["blob"], document_id)
-                if table_md:
-                    return ExtractedIndexingText(text=table_md, page_offsets=[])
+    ext = os.path.splitext(file_name or "")[1].lower()
+    if ext in TEXT_FILE_EXTENSIONS:
+        original_file = await ad.common.get_file_async(analytiq_client, doc["mongo_file_name"])
+        if original_file and original_file["blob"]:
+            logger.info(f"{document_id}: Exporting original file content for indexing")
+            try:
+                raw = original_file["blob"].decode("utf-8")
+            except UnicodeDecodeError:
+                raw = original_file["blob"].decode("latin-1")
+            return ExtractedIndexingText(text=preprocess_markdown(raw, cfg), page_offsets=[])
+    elif ext in TABULAR_FILE_EXTENSIONS:
+        original_file = await ad.common.get_file_async(analytiq_client, doc["mongo_file_name"])
+        if original_file and original_file["blob"]:
+            table_md = _convert_tabular_file_to_markdown(ext, original_file["blob"], document_id)
+            if table_md:
+                return ExtractedIndexingText(text=table_md, page_offsets=[])
 
     logger.info(f"{document_id}: No extractable text. Skipping indexing.")
     return None
@@ -773,7 +810,7 @@ async def index_document_in_kb(
     
     prep = chunking_preprocess_from_kb_dict(kb)
     extracted = await get_extracted_indexing_text(
-        analytiq_client, document_id, preprocess=prep
+        analytiq_client, document_id, preprocess=prep, doc=doc
     )
     file_name = doc.get("user_file_name", "")
     if extracted is None or not extracted.text.strip():
@@ -848,7 +885,7 @@ async def index_document_in_kb(
             "chunk_index": chunk.chunk_index,
             "chunk_hash": chunk.hash,
             "chunk_text": chunk.text,
-            "embedding": embedding,
+            "embedding": encode_kb_embedding(embedding),
             "token_count": chunk.token_count,
             "indexed_text_start": chunk.indexed_text_start,
             "indexed_text_end": chunk.indexed_text_end,
@@ -869,9 +906,9 @@ async def index_document_in_kb(
             {"document_id": document_id},
             session=session
         )
-        # Insert new vectors
+        # Insert new vectors in one unordered batch (fresh _ids, old vectors deleted above)
         if new_vectors:
-            await vectors_collection.insert_many(new_vectors, session=session)
+            await vectors_collection.insert_many(new_vectors, ordered=False, session=session)
         # Update or insert document_index entry
         await db.document_index.update_one(
             {
@@ -112,10 +112,8 @@ def format_kb_search_results_for_llm(results: List[Dict[str, Any]]) -> str:
                 best = max(float(x) for x in rels)
                 lines.append(f"Relevance: {best:.6f}\n")
 
-        # Preserve global search ranking order for chunks without stored spans
-        for r in results:
-            if (r.get("document_id") or "") != doc_id:
-                continue
+        # Preserve global search ranking order for chunks without stored spans (group keeps it)
+        for r in group:
             if _has_indexed_spans(r):
                 continue
             block_index += 1
@@ -213,7 +213,9 @@ async def _reconcile_document(
             }).to_list(length=None)
         else:
             # Document has no tags - check all KBs where it might be indexed
-            existing_index_entries = await db.document_index.find({"document_id": doc_id}).to_list(length=None)
+            existing_index_entries = await db.document_index.find(
+                {"document_id": doc_id}, {"_id": 0, "kb_id": 1}
+            ).to_list(length=None)
             existing_kb_ids = {entry["kb_id"] for entry in existing_index_entries}
             if existing_kb_ids:
                 kbs_to_check = await db.knowledge_bases.find({
@@ -250,11 +252,10 @@ async def _reconcile_document(
         should_be_indexed = bool(doc_tag_ids & kb_tag_ids) if kb_tag_ids else False
         
         # Check if document is indexed in this KB
-        index_entry = await db.document_index.find_one({
-            "kb_id": kb_id_str,
-            "document_id": doc_id
-        })
-        is_indexed = index_entry is not None
+        # Existence check only: count against the (kb_id, document_id) index instead of fetching the row
+        is_indexed = await db.document_index.count_documents(
+            {"kb_id": kb_id_str, "document_id": doc_id}, limit=1
+        ) > 0
         
         if should_be_indexed and not is_indexed:
             # Document should be indexed but isn't
@@ -265,6 +266,7 @@ async def _reconcile_document(
                     analytiq_client,
                     doc_id,
                     preprocess=chunking_preprocess_from_kb_dict(kb),
+                    doc=doc,
                 )
                 if extracted and extracted.text.strip():
                     kb_msg = {"document_id": doc_id, "kb_id": kb_id_str}
@@ -281,14 +283,7 @@ async def _reconcile_document(
         # Check for orphaned vectors for this document
         collection_name = f"kb_vectors_{kb_id_str}"
         vectors_collection = db[collection_name]
-        if is_indexed:
-            # Check if vectors exist but index entry doesn't (shouldn't happen, but check anyway)
-            vector_count = await vectors_collection.count_documents({"document_id": doc_id})
-            if vector_count > 0 and not index_entry:
-                kb_result["orphaned_vectors"] = vector_count
-                if not dry_run:
-                    await vectors_collection.delete_many({"document_id": doc_id})
-        else:
+        if not is_indexed:
             # Document not indexed - check if there are orphaned vectors
             vector_count = await vectors_collection.count_documents({"document_id": doc_id})
             if vector_count > 0:
@@ -351,7 +346,9 @@ async def _reconcile_kb_full(
     
     # First, get all existing document_index entries for this KB (we need this set for comparison)
     # This is typically much smaller than all documents, so loading it is acceptable
-    existing_index_entries = await db.document_index.find({"kb_id": kb_id}).to_list(length=None)
+    existing_index_entries = await db.document_index.find(
+        {"kb_id": kb_id}, {"_id": 0, "document_id": 1}
+    ).to_list(length=None)
     existing_doc_ids = {entry["document_id"] for entry in existing_index_entries}
     
     # Process matching documents in batches
@@ -377,6 +374,7 @@ async def _reconcile_kb_full(
                     analytiq_client,
                     doc_id,
                     preprocess=chunking_preprocess_from_kb_dict(kb),
+                    doc=doc,
                 )
                 if extracted and extracted.text.strip():
                     results["missing_documents"].append(doc_id)
@@ -400,7 +398,10 @@ async def _reconcile_kb_full(
         
         for entry in batch:
             doc_id = entry["document_id"]
-            doc = await db.docs.find_one({"_id": ObjectId(doc_id), "organization_id": organization_id})
+            doc = await db.docs.find_one(
+                {"_id": ObjectId(doc_id), "organization_id": organization_id},
+                {"tag_ids": 1},
+            )
             
             if not doc:
                 # Document was deleted - will be handled by deletion hook, but we can still mark it
@@ -434,12 +435,11 @@ async def _reconcile_kb_full(
         
         for vector_doc_id in batch:
             # Check if document_index entry exists
-            index_entry = await db.document_index.find_one({
-                "kb_id": kb_id,
-                "document_id": vector_doc_id
-            })
+            is_indexed = await db.document_index.count_documents(
+                {"kb_id": kb_id, "document_id": vector_doc_id}, limit=1
+            ) > 0
             
-            if not index_entry:
+            if not is_indexed:
                 # Orphaned vectors found
                 if not dry_run:
                     # Delete orphaned vectors
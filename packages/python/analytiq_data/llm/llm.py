@@ -1124,6 +1124,48 @@ async def run_llm(
     total_cost = 0.0
     
     if kb_id and tools:
+        async def run_kb_search_tool_call(tool_call) -> str:
+            """Run one search_knowledge_base tool call; errors become the tool response text."""
+            try:
+                args = json.loads(tool_call.function.arguments)
+                search_query = args.get("query", "")
+                top_k = args.get("top_k", 5)
+                metadata_filter = args.get("metadata_filter")
+                coalesce_neighbors = args.get("coalesce_neighbors")
+                
+                logger.info(f"{document_id}/{prompt_revid}: LLM requested KB search: query='{search_query}', top_k={top_k}")
+                
+                search_results = await ad.kb.search.search_knowledge_base(
+                    analytiq_client=analytiq_client,
+                    kb_id=kb_id,
+                    query=search_query,
+                    organization_id=org_id,
+                    top_k=top_k,
+                    metadata_filter=metadata_filter,
+                    coalesce_neighbors=coalesce_neighbors
+                )
+                
+                logger.info(f"{document_id}/{prompt_revid}: KB search returned {len(search_results.get('results', []))} results")
+                
+                # Format search results for LLM (merge overlapping spans per document)
+                return ad.kb.format_kb_search_results_for_llm(
+                    search_results.get("results", [])
+                )
+            except Exception as e:
+                error_msg = str(e)
+                # Check if this is a vector index timing issue
+                if "INITIAL_SYNC" in error_msg or "NOT_STARTED" in error_msg or "cannot query vector index" in error_msg.lower():
+                    logger.warning(
+                        f"{document_id}/{prompt_revid}: KB search index not ready yet (timing issue). "
+                        f"Error: {error_msg[:200]}"
+                    )
+                    return (
+                        "The knowledge base search index is still building. "
+                        "This is a temporary issue - please try again in a few moments."
+                    )
+                logger.error(f"{document_id}/{prompt_revid}: Error handling KB search tool call: {e}")
+                return f"Error searching knowledge base: {error_msg[:200]}"
+
         # Agentic loop: handle tool calls iteratively
         iteration = 0
         response = None
@@ -1157,95 +1199,49 @@ async def run_llm(
                 logger.info(f"{document_id}/{prompt_revid}: LLM completed after {iteration} iteration(s)")
                 break
             
-            # Handle tool calls
+            # Run the KB searches of this turn concurrently; results keep the tool_calls order
+            kb_tool_calls = []
             for tool_call in tool_calls:
                 if tool_call.function.name == "search_knowledge_base":
-                    # Parse function arguments
-                    try:
-                        args = json.loads(tool_call.function.arguments)
-                        search_query = args.get("query", "")
-                        top_k = args.get("top_k", 5)
-                        metadata_filter = args.get("metadata_filter")
-                        coalesce_neighbors = args.get("coalesce_neighbors")
-                        
-                        logger.info(f"{document_id}/{prompt_revid}: LLM requested KB search: query='{search_query}', top_k={top_k}")
-                        
-                        # Perform KB search
-                        search_results = await ad.kb.search.search_knowledge_base(
-                            analytiq_client=analytiq_client,
-                            kb_id=kb_id,
-                            query=search_query,
-                            organization_id=org_id,
-                            top_k=top_k,
-                            metadata_filter=metadata_filter,
-                            coalesce_neighbors=coalesce_neighbors
-                        )
-                        
-                        # Format search results for LLM (merge overlapping spans per document)
-                        formatted_context = ad.kb.format_kb_search_results_for_llm(
-                            search_results.get("results", [])
-                        )
-                        
-                        # Add tool response to messages
-                        messages.append({
-                            "role": "assistant",
-                            "content": None,
-                            "tool_calls": [
-                                {
-                                    "id": tool_call.id,
-                                    "type": "function",
-                                    "function": {
-                                        "name": tool_call.function.name,
-                                        "arguments": tool_call.function.arguments
-                                    }
-                                }
-                            ]
-                        })
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "content": formatted_context
-                        })
-                        
-                        logger.info(f"{document_id}/{prompt_revid}: Added {len(search_results.get('results', []))} KB search results to conversation")
-                    except Exception as e:
-                        error_msg = str(e)
-                        # Check if this is a vector index timing issue
-                        if "INITIAL_SYNC" in error_msg or "NOT_STARTED" in error_msg or "cannot query vector index" in error_msg.lower():
-                            logger.warning(
-                                f"{document_id}/{prompt_revid}: KB search index not ready yet (timing issue). "
-                                f"Error: {error_msg[:200]}"
-                            )
-                            error_content = (
-                                "The knowledge base search index is still building. "
-                                "This is a temporary issue - please try again in a few moments."
-                            )
-                        else:
-                            logger.error(f"{document_id}/{prompt_revid}: Error handling KB search tool call: {e}")
-                            error_content = f"Error searching knowledge base: {error_msg[:200]}"
-                        
-                        # Add error message to conversation
-                        messages.append({
-                            "role": "assistant",
-                            "content": None,
-                            "tool_calls": [
-                                {
-                                    "id": tool_call.id,
-                                    "type": "function",
-                                    "function": {
-                                        "name": tool_call.function.name,
-                                        "arguments": tool_call.function.arguments
-                                    }
-                                }
-                            ]
-                        })
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "content": error_content
-                        })
+                    kb_tool_calls.append(tool_call)
                 else:
                     logger.warning(f"{document_id}/{prompt_revid}: Unknown tool call: {tool_call.function.name}")
+
+            # Each search may charge 1 SPU. Concurrent searches would each pass their own SPU check
+            # before any records usage, so check the whole batch first; if the org can't cover it,
+            # run them one at a time so every check sees the previous search's charge.
+            batch_affordable = False
+            if len(kb_tool_calls) > 1:
+                try:
+                    batch_affordable = await ad.payments.check_spu_limits(org_id, len(kb_tool_calls)) is not False
+                except ad.payments.SPUCreditException as e:
+                    logger.info(f"{document_id}/{prompt_revid}: {len(kb_tool_calls)} KB searches exceed SPU credits, running sequentially: {e}")
+
+            if batch_affordable:
+                tool_contents = await asyncio.gather(*(run_kb_search_tool_call(tc) for tc in kb_tool_calls))
+            else:
+                tool_contents = [await run_kb_search_tool_call(tc) for tc in kb_tool_calls]
+
+            for tool_call, tool_content in zip(kb_tool_calls, tool_contents):
+                messages.append({
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": tool_call.id,
+                            "type": "function",
+                            "function": {
+                                "name": tool_call.function.name,
+                                "arguments": tool_call.function.arguments
+                            }
+                        }
+                    ]
+                })
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "content": tool_content
+                })
             
             # Continue loop to get LLM response with tool results
             if iteration >= max_iterations:
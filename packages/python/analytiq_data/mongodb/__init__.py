@@ -6,7 +6,10 @@ from .index_registry import (
     DEPRECATED_INDEXES,
     EXPECTED_INDEXES,
     IndexSpec,
+    KB_VECTORS_INDEX_TEMPLATES,
+    KB_VECTORS_STORAGE_ENGINE,
     WORKER_QUEUE_COLLECTIONS,
     all_reconcile_index_specs,
+    expand_kb_vectors_index_specs,
     expand_worker_queue_index_specs,
 )
\ No newline at end of file
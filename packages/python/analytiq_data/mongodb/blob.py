@@ -114,7 +114,7 @@ async def delete_blob_async(analytiq_client, bucket:str, key:str):
         try:
             # First, find the file document to get the _id
             files_collection = db[f"{bucket}.files"]
-            file_docs = await files_collection.find({"filename": key}).to_list(length=None)
+            file_docs = await files_collection.find({"filename": key}, {"_id": 1}).to_list(length=None)
             
             if file_docs:
                 for file_doc in file_docs:
@@ -127,8 +127,8 @@ async def delete_blob_async(analytiq_client, bucket:str, key:str):
                 # Verify deletion is complete
                 verification_attempts = 3
                 for _ in range(verification_attempts):
-                    check_docs = await files_collection.find({"filename": key}).to_list(length=None)
-                    if not check_docs:
+                    remaining = await files_collection.find_one({"filename": key}, {"_id": 1})
+                    if remaining is None:
                         break
                     await asyncio.sleep(retry_delay)
                 else:
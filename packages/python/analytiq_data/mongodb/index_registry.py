@@ -325,6 +325,20 @@ WORKER_QUEUE_INDEX_TEMPLATES: tuple[IndexSpec, ...] = (
     ),
 )
 
+# WiredTiger options for new knowledge-base vector collections (kb_vectors_<kb_id>): zstd compresses
+# packed float32 vectors and chunk text better than the snappy default.
+KB_VECTORS_STORAGE_ENGINE: dict = {"wiredTiger": {"configString": "block_compressor=zstd"}}
+
+# Shared index definitions applied to each knowledge-base vector collection (kb_vectors_<kb_id>).
+KB_VECTORS_INDEX_TEMPLATES: tuple[IndexSpec, ...] = (
+    # Per-document deletes/counts on re-index, removal and reconcile; chunk listing sorted by chunk_index
+    _spec(
+        "_",
+        "document_id_chunk_index_idx",
+        [("document_id", 1), ("chunk_index", 1)],
+    ),
+)
+
 EXPECTED_INDEXES: tuple[IndexSpec, ...] = _PHASE1_INDEXES + _PHASE2_INDEXES
 
 # Legacy index superseded by access_tokens_fingerprint_unique (AddAccessTokenFingerprint).
@@ -344,11 +358,26 @@ def expand_worker_queue_index_specs(collection_names: set[str] | frozenset[str])
         if name.startswith("queues.kb_index_") and name not in queue_collections:
             queue_collections.append(name)
 
+    return _expand_index_templates(
+        WORKER_QUEUE_INDEX_TEMPLATES,
+        [coll for coll in queue_collections if coll in collection_names],
+    )
+
+
+def expand_kb_vectors_index_specs(collection_names: set[str] | frozenset[str]) -> tuple[IndexSpec, ...]:
+    """Build per-collection index specs for each ``kb_vectors_*`` collection present."""
+    return _expand_index_templates(
+        KB_VECTORS_INDEX_TEMPLATES,
+        sorted(name for name in collection_names if name.startswith("kb_vectors_")),
+    )
+
+
+def _expand_index_templates(
+    templates: tuple[IndexSpec, ...], collections: list[str]
+) -> tuple[IndexSpec, ...]:
     specs: list[IndexSpec] = []
-    for coll in queue_collections:
-        if coll not in collection_names:
-            continue
-        for tmpl in WORKER_QUEUE_INDEX_TEMPLATES:
+    for coll in collections:
+        for tmpl in templates:
             specs.append(
                 IndexSpec(
                     collection=coll,
@@ -365,10 +394,14 @@ def expand_worker_queue_index_specs(collection_names: set[str] | frozenset[str])
 
 
 def all_reconcile_index_specs(collection_names: set[str] | frozenset[str]) -> tuple[IndexSpec, ...]:
-    """Full reconcile target list: fixed registry + worker queue collections present in ``db``."""
+    """Full reconcile target list: fixed registry + worker queue and KB vector collections present in ``db``."""
     fixed = tuple(
         spec
         for spec in EXPECTED_INDEXES
         if not (spec.skip_if_collection_missing and spec.collection not in collection_names)
     )
-    return fixed + expand_worker_queue_index_specs(collection_names)
+    return (
+        fixed
+        + expand_worker_queue_index_specs(collection_names)
+        + expand_kb_vectors_index_specs(collection_names)
+    )
@@ -66,7 +66,9 @@ async def process_kb_index_msg(analytiq_client, msg, force: bool = False):
             else:
                 # Remove from all KBs (find all KBs this document is in)
                 db = analytiq_client.mongodb_async[analytiq_client.env]
-                index_entries = await db.document_index.find({"document_id": document_id}).to_list(length=None)
+                index_entries = await db.document_index.find(
+                    {"document_id": document_id}, {"_id": 0, "kb_id": 1}
+                ).to_list(length=None)
                 for entry in index_entries:
                     await remove_document_from_kb(
                         analytiq_client,
@@ -91,7 +93,9 @@ async def process_kb_index_msg(analytiq_client, msg, force: bool = False):
                 db = analytiq_client.mongodb_async[analytiq_client.env]
                 
                 # Get all KBs the document is currently indexed in
-                existing_index_entries = await db.document_index.find({"document_id": document_id}).to_list(length=None)
+                existing_index_entries = await db.document_index.find(
+                    {"document_id": document_id}, {"_id": 0, "kb_id": 1}
+                ).to_list(length=None)
                 existing_kb_ids = {str(entry["kb_id"]) for entry in existing_index_entries}
                 
                 if not doc_tag_ids:
@@ -85,10 +85,8 @@ def decode_ocr_blob_bytes(blob_bytes: bytes) -> Any:
     return pickle.loads(blob_bytes)
 
 
-async def get_ocr_json(
-    analytiq_client, document_id: str
-) -> list | dict | None:
-    """Get OCR data: legacy flat list, Textract dict, or JSON (Mistral/LLM pages)."""
+async def _get_ocr_json_blob_bytes(analytiq_client, document_id: str) -> bytes | None:
+    """Raw stored OCR blob (``{id}_json``, else legacy ``{id}_list``), or None."""
     key = f"{document_id}_json"
     ocr_blob = await ad.mongodb.get_blob_async(analytiq_client, bucket=OCR_BUCKET, key=key)
 
@@ -99,10 +97,36 @@ async def get_ocr_json(
     if ocr_blob is None:
         return None
 
-    blob_bytes = ocr_blob["blob"]
+    return ocr_blob["blob"]
+
+
+async def get_ocr_json(
+    analytiq_client, document_id: str
+) -> list | dict | None:
+    """Get OCR data: legacy flat list, Textract dict, or JSON (Mistral/LLM pages)."""
+    blob_bytes = await _get_ocr_json_blob_bytes(analytiq_client, document_id)
+    if blob_bytes is None:
+        return None
     return await asyncio.to_thread(decode_ocr_blob_bytes, blob_bytes)
 
 
+async def get_ocr_json_bytes(analytiq_client, document_id: str) -> bytes | None:
+    """
+    Get OCR data as UTF-8 JSON bytes, for serving without a decode/re-encode round trip.
+
+    JSON blobs are returned as stored; legacy pickle blobs are decoded and encoded like
+    :func:`save_ocr_json` does.
+    """
+    blob_bytes = await _get_ocr_json_blob_bytes(analytiq_client, document_id)
+    if blob_bytes is None:
+        return None
+    if blob_bytes.lstrip()[:1] in (b"{", b"["):
+        return blob_bytes
+    return await asyncio.to_thread(
+        lambda: json.dumps(decode_ocr_blob_bytes(blob_bytes), ensure_ascii=False, default=str).encode("utf-8")
+    )
+
+
 async def save_ocr_json(
     analytiq_client,
     document_id: str,
@@ -13,6 +13,7 @@ from pydantic import BaseModel, Field, field_validator, model_validator
 # Third-party imports
 from fastapi import APIRouter, Depends, HTTPException, Query, Body, BackgroundTasks
 from bson import ObjectId
+from pymongo.errors import CollectionInvalid, OperationFailure
 
 # Local imports
 import analytiq_data as ad
@@ -51,6 +52,8 @@ DEFAULT_COALESCE_NEIGHBORS = 1
 MIN_CHUNK_SIZE = 50
 MAX_CHUNK_SIZE = 2000
 MAX_COALESCE_NEIGHBORS = 5
+# First wait between listSearchIndexes polls; doubles up to the caller's poll_interval
+INITIAL_INDEX_POLL_INTERVAL = 0.1
 
 # KB Models
 class KnowledgeBaseConfig(BaseModel):
@@ -318,13 +321,15 @@ async def wait_for_vector_index_ready(
     Poll ``listSearchIndexes`` until the vector index is queryable.
 
     Call after ``createSearchIndexes`` so clients do not hit "no index in catalog" races.
+    Polls start at ``INITIAL_INDEX_POLL_INTERVAL`` and back off exponentially, so an index
+    that is ready almost immediately is not held up by a full ``poll_interval``.
 
     Args:
         analytiq_client: AnalytiqClient instance
         kb_id: Knowledge base ID
         embedding_dimensions: Embedding width for the KB (must match ``kb_vector_index``)
         max_wait_seconds: Maximum time to wait in seconds
-        poll_interval: Time between polls in seconds
+        poll_interval: Longest time between polls in seconds
 
     Raises:
         HTTPException: 503 if the index does not become queryable in time; 500 on unexpected errors
@@ -332,10 +337,14 @@ async def wait_for_vector_index_ready(
     db = ad.common.get_async_db(analytiq_client)
     collection_name = f"kb_vectors_{kb_id}"
     collection = db[collection_name]
-    max_attempts = max(1, int(max_wait_seconds / poll_interval))
+    t0 = time.monotonic()
+    deadline = t0 + max_wait_seconds
+    delay = min(INITIAL_INDEX_POLL_INTERVAL, poll_interval)
 
     last_status = "UNKNOWN"
-    for i in range(max_attempts):
+    attempt = 0
+    while True:
+        attempt += 1
         try:
             cursor = collection.list_search_indexes(name="kb_vector_index")
             indexes = await cursor.to_list(length=10)
@@ -344,25 +353,29 @@ async def wait_for_vector_index_ready(
                 queryable = indexes[0].get("queryable", False)
                 if queryable:
                     logger.info(
-                        f"Vector index for KB {kb_id} is queryable (status={last_status}) after {i * poll_interval:.1f}s"
+                        f"Vector index for KB {kb_id} is queryable (status={last_status}) "
+                        f"after {time.monotonic() - t0:.1f}s"
                     )
                     return
                 logger.debug(
                     f"Vector index for KB {kb_id} not ready: status={last_status} queryable={queryable} "
-                    f"(attempt {i + 1}/{max_attempts})"
+                    f"(attempt {attempt})"
                 )
             else:
                 last_status = "NOT_FOUND"
                 logger.debug(
-                    f"Vector index for KB {kb_id} not yet visible (attempt {i + 1}/{max_attempts})"
+                    f"Vector index for KB {kb_id} not yet visible (attempt {attempt})"
                 )
         except Exception as e:
             logger.warning(
-                f"Error polling vector index status for KB {kb_id} (attempt {i + 1}/{max_attempts}): {e}"
+                f"Error polling vector index status for KB {kb_id} (attempt {attempt}): {e}"
             )
 
-        if i < max_attempts - 1:
-            await asyncio.sleep(poll_interval)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, poll_interval)
 
     raise HTTPException(
         status_code=503,
@@ -395,35 +408,36 @@ async def create_vector_search_index(
     db = ad.common.get_async_db(analytiq_client)
     collection_name = f"kb_vectors_{kb_id}"
     
-    # Ensure the collection exists before creating the search index
-    # MongoDB requires the collection to exist before creating a search index
-    # We ensure it exists by inserting a temporary document (keep it until index is created)
+    # MongoDB requires the collection to exist before creating a search index.
+    # Create it explicitly so it always gets the KB vectors storage options (zstd block compression).
     collection = db[collection_name]
+    try:
+        await db.create_collection(collection_name, storageEngine=ad.mongodb.KB_VECTORS_STORAGE_ENGINE)
+        logger.info(f"Created collection {collection_name} for KB {kb_id}")
+    except CollectionInvalid:
+        pass  # Already exists (e.g. retried creation) - keep its storage options
+    except OperationFailure as e:
+        if e.code != 48:  # NamespaceExists: lost a creation race, same as above
+            logger.error(f"Failed to create collection {collection_name} for KB {kb_id}: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to create KB vector collection: {str(e)}"
+            )
+
+    # Keep a temporary document until the search index exists - mongot may need the collection to have content
     temp_doc_inserted = False
     try:
-        # Insert a temporary document to ensure collection exists
-        # Keep it until after index creation - mongot may need the collection to have content
         await collection.insert_one({"_id": "temp_init", "temp": True})
         temp_doc_inserted = True
-        logger.info(f"Ensured collection {collection_name} exists for KB {kb_id}")
     except Exception as e:
-        # If insert fails, collection might not exist - try creating it explicitly
-        logger.warning(f"Could not ensure collection exists via insert, trying create_collection: {e}")
-        try:
-            await db.create_collection(collection_name)
-            # After creating, insert temp doc to make it visible to mongot
-            await collection.insert_one({"_id": "temp_init", "temp": True})
-            temp_doc_inserted = True
-            logger.info(f"Created collection {collection_name} for KB {kb_id}")
-        except Exception as create_error:
-            # Collection might already exist, that's okay - try inserting temp doc
-            if "already exists" not in str(create_error).lower() and "NamespaceExists" not in str(create_error):
-                logger.warning(f"Collection creation issue (may already exist): {create_error}")
-            try:
-                await collection.insert_one({"_id": "temp_init", "temp": True})
-                temp_doc_inserted = True
-            except Exception:
-                pass  # Collection exists but we can't insert - proceed anyway
+        logger.warning(f"Could not insert temporary document into {collection_name}: {e}")
+
+    # Regular index for per-document vector deletes/counts; deploy-time reconcile covers older KBs
+    try:
+        for spec in ad.mongodb.expand_kb_vectors_index_specs({collection_name}):
+            await collection.create_index(spec.keys, name=spec.name, background=True)
+    except Exception as e:
+        logger.warning(f"Could not create document_id index on {collection_name}: {e}")
     
     # Atlas / MongoDB Search: vector + lexical indexes in one command
     search_indexes = [
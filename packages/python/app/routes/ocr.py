@@ -3,7 +3,6 @@
 # Standard library imports
 import asyncio
 import gzip
-import json
 import logging
 from typing import Literal, Optional
 from pydantic import BaseModel, Field
@@ -11,7 +10,6 @@ from pydantic import BaseModel, Field
 # Third-party imports
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, Body
-from fastapi.responses import JSONResponse
 
 # Local imports
 import analytiq_data as ad
@@ -147,7 +145,7 @@ async def download_ocr_json(
     current_user: User = Depends(get_org_user),
 ):
     """
-    Download stored OCR JSON as persisted (decoded UTF-8 JSON from GridFS).
+    Download stored OCR JSON as persisted (UTF-8 JSON bytes from GridFS, not re-encoded).
 
     Shape depends on engine: legacy flat block list, Textract ``GetDocumentAnalysis``-style dict
     (with ``Blocks`` / ``DocumentMetadata``), Mistral/LLM ``{ "pages": [...] }``, etc. No server-side
@@ -170,26 +168,24 @@ async def download_ocr_json(
     if not ad.common.doc.ocr_supported(file_name):
         raise HTTPException(status_code=404, detail="OCR not supported for this document extension")
 
-    # Get the OCR JSON data from mongodb
-    ocr_json = await ad.ocr.get_ocr_json(analytiq_client, document_id)
-    if ocr_json is None:
+    # Get the stored OCR JSON bytes from mongodb; served as-is, without decoding
+    ocr_json_bytes = await ad.ocr.get_ocr_json_bytes(analytiq_client, document_id)
+    if ocr_json_bytes is None:
         raise HTTPException(status_code=404, detail="OCR data not found")
 
     headers = {"Cache-Control": "private, max-age=3600"}
 
     if format == "gzip":
-        # Run CPU-bound json.dumps + gzip.compress in a thread pool so the event loop is not blocked
-        def _serialize_and_compress(data: object) -> bytes:
-            return gzip.compress(json.dumps(data).encode("utf-8"))
-
-        body = await asyncio.to_thread(_serialize_and_compress, ocr_json)
+        # Run CPU-bound gzip.compress in a thread pool so the event loop is not blocked.
+        # Level 6 (zlib's default) compresses JSON nearly as tightly as gzip's default 9, much faster.
+        body = await asyncio.to_thread(gzip.compress, ocr_json_bytes, compresslevel=6)
         return Response(
             content=body,
             media_type="application/json",
             headers={**headers, "Content-Encoding": "gzip"},
         )
 
-    return JSONResponse(content=ocr_json, headers=headers)
+    return Response(content=ocr_json_bytes, media_type="application/json", headers=headers)
 
 
 @ocr_router.get("/v0/orgs/{organization_id}/ocr/download/text/{document_id}", response_model=str)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 from datetime import datetime, UTC
 from typing import Any, Tuple
 from unittest.mock import Mock
@@ -14,19 +16,26 @@ from analytiq_data.kb.chunking_config import chunking_preprocess_for_preset
 from .conftest_utils import TEST_ORG_ID, client, get_auth_headers
 
 MOCK_EMBEDDING_DIMENSIONS = 1536
+# Built once and shared by every mock vector; tests only need a non-zero vector of the right width
+_MOCK_EMBEDDING = [0.001 * (j % 100 + 1) for j in range(MOCK_EMBEDDING_DIMENSIONS)]
 
 
+@functools.lru_cache(maxsize=None)
 def create_mock_embedding_response(num_embeddings: int = 1):
-    """Non-zero vectors for cosine similarity; Mock (not AsyncMock) for get_embedding_cost()."""
+    """Non-zero vectors for cosine similarity; Mock (not AsyncMock) for get_embedding_cost().
+
+    Cached per ``num_embeddings``: callers must treat the response as read-only.
+    """
     mock_response = Mock()
-    embeddings = []
-    for _ in range(num_embeddings):
-        embedding = [0.001 * (j % 100 + 1) for j in range(MOCK_EMBEDDING_DIMENSIONS)]
-        embeddings.append({"embedding": embedding})
-    mock_response.data = embeddings
+    mock_response.data = [{"embedding": _MOCK_EMBEDDING}] * num_embeddings
     return mock_response
 
 
+def mock_embedding_for_input(*args: Any, **kwargs: Any):
+    """``side_effect`` for a patched ``litellm.aembedding``: one vector per input text."""
+    return create_mock_embedding_response(max(len(kwargs.get("input") or ()), 1))
+
+
 def create_tag_api(name: str, color: str = "#FF5733") -> str:
     r = client.post(
         f"/v0/orgs/{TEST_ORG_ID}/tags",
@@ -84,6 +93,33 @@ async def cleanup_org_kb_artifacts(test_db) -> None:
     await test_db.tags.delete_many({"organization_id": TEST_ORG_ID})
 
 
+async def insert_ocr_completed_doc(
+    test_db,
+    analytiq_client,
+    document_id: str,
+    file_name: str,
+    tag_ids: list,
+    ocr_text: str,
+    *,
+    mongo_file_name: str = "test_file.pdf",
+) -> None:
+    """Insert an OCR-completed docs row and save its OCR text concurrently (no process_ocr_msg)."""
+    await asyncio.gather(
+        test_db.docs.insert_one(
+            {
+                "_id": ObjectId(document_id),
+                "organization_id": TEST_ORG_ID,
+                "user_file_name": file_name,
+                "tag_ids": tag_ids,
+                "upload_date": datetime.now(UTC),
+                "state": ad.common.doc.DOCUMENT_STATE_OCR_COMPLETED,
+                "mongo_file_name": mongo_file_name,
+            }
+        ),
+        ad.ocr.save_ocr_text(analytiq_client, document_id, ocr_text),
+    )
+
+
 async def insert_org_tag(test_db, name: str, color: str = "#FF5733") -> str:
     """Insert a tag for TEST_ORG_ID (no HTTP). Returns tag id string."""
     oid = ObjectId()
@@ -50,9 +50,16 @@ def reset_index_tracking(worker_key: str) -> None:
 
 
 async def clear_all_documents(db: AsyncIOMotorDatabase) -> None:
-    """Remove all documents; indexes and collections are preserved."""
+    """Delete all documents, keeping collections and indexes, and drop per-KB ``kb_vectors_*`` collections.
+
+    The KB rows that own the ``kb_vectors_*`` collections are cleared too, so nothing reuses them,
+    and a drop is cheaper than deleting every vector.
+    """
     for name in await db.list_collection_names():
-        await db[name].delete_many({})
+        if name.startswith("kb_vectors_"):
+            await db.drop_collection(name)
+        else:
+            await db[name].delete_many({})
 
 
 async def drop_all_collections(db: AsyncIOMotorDatabase) -> None:
@@ -18,6 +18,17 @@ async def test_returns_none_when_document_missing(mock_get_doc):
     assert out is None
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("file_name", [None, ""])
+@patch("analytiq_data.kb.indexing.ad.common.get_file_async", new_callable=AsyncMock)
+async def test_returns_none_when_file_name_missing(mock_get_file, file_name):
+    client = object()
+    doc = {"user_file_name": file_name, "mongo_file_name": "blob-key"}
+    out = await get_extracted_indexing_text(client, "doc-1", doc=doc)
+    assert out is None
+    mock_get_file.assert_not_called()
+
+
 @pytest.mark.asyncio
 @patch("analytiq_data.kb.indexing.ad.ocr.get_ocr_text", new_callable=AsyncMock)
 @patch("analytiq_data.kb.indexing.ad.ocr.get_ocr_json", new_callable=AsyncMock)
@@ -150,28 +161,40 @@ async def test_csv_returns_markdown_table(mock_get_doc, mock_get_file):
 
 
 @pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "file_name, stored_file",
+    [
+        ("data.csv", None),
+        ("data.xlsx", None),
+        ("data.xls", {"blob": b""}),
+        ("empty.txt", {"blob": b""}),
+        ("notes.md", None),
+    ],
+)
 @patch("analytiq_data.kb.indexing.ad.common.get_file_async", new_callable=AsyncMock)
 @patch("analytiq_data.kb.indexing.ad.common.doc.get_doc", new_callable=AsyncMock)
-async def test_csv_returns_none_when_blob_missing(mock_get_doc, mock_get_file):
+async def test_non_ocr_returns_none_when_blob_missing_or_empty(
+    mock_get_doc, mock_get_file, file_name, stored_file
+):
     mock_get_doc.return_value = {
-        "user_file_name": "data.csv",
-        "mongo_file_name": "files/data.csv",
+        "user_file_name": file_name,
+        "mongo_file_name": f"files/{file_name}",
     }
-    mock_get_file.return_value = None
+    mock_get_file.return_value = stored_file
     client = object()
     out = await get_extracted_indexing_text(client, "doc-1")
     assert out is None
+    mock_get_file.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 @patch("analytiq_data.kb.indexing.ad.common.get_file_async", new_callable=AsyncMock)
 @patch("analytiq_data.kb.indexing.ad.common.doc.get_doc", new_callable=AsyncMock)
-async def test_txt_returns_none_when_blob_empty(mock_get_doc, mock_get_file):
-    mock_get_doc.return_value = {
-        "user_file_name": "empty.txt",
-        "mongo_file_name": "files/empty.txt",
-    }
-    mock_get_file.return_value = {"blob": b""}
+async def test_prefetched_doc_skips_lookup(mock_get_doc, mock_get_file):
+    mock_get_file.return_value = {"blob": b"already loaded"}
     client = object()
-    out = await get_extracted_indexing_text(client, "doc-1")
-    assert out is None
+    doc = {"user_file_name": "notes.md", "mongo_file_name": "files/notes.md"}
+    out = await get_extracted_indexing_text(client, "doc-1", doc=doc)
+    assert out is not None
+    assert out.text == "already loaded"
+    mock_get_doc.assert_not_called()
@@ -110,6 +110,17 @@ async def test_reconcile_worker_queue_indexes(test_db):
     assert "status_processing_attempts_idx" in names
 
 
+@pytest.mark.asyncio
+async def test_reconcile_kb_vectors_indexes(test_db):
+    await test_db["kb_vectors_test"].insert_one({"document_id": "doc-1", "chunk_index": 0})
+
+    await reconcile_indexes(test_db)
+
+    indexes = await test_db["kb_vectors_test"].list_indexes().to_list(length=None)
+    names = {idx["name"] for idx in indexes}
+    assert "document_id_chunk_index_idx" in names
+
+
 @pytest.mark.asyncio
 async def test_reconcile_skips_gridfs_when_bucket_missing(test_db):
     summary = await reconcile_indexes(test_db)
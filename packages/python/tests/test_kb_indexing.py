@@ -5,18 +5,20 @@ plus mocked API tests that do not run KB worker logic or mongot search.
 
 import logging
 import os
-from datetime import datetime, UTC
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from bson import ObjectId
+from bson.binary import Binary
 
 from .conftest_utils import TEST_ORG_ID, client, get_auth_headers
 from .kb_test_helpers import (
+    MOCK_EMBEDDING_DIMENSIONS,
     create_kb_api,
-    create_mock_embedding_response,
     create_tag_api,
     delete_kb_api,
+    insert_ocr_completed_doc,
+    mock_embedding_for_input,
 )
 import analytiq_data as ad
 
@@ -25,6 +27,29 @@ logger = logging.getLogger(__name__)
 assert os.environ["ENV"] == "pytest"
 
 
+@pytest.fixture(autouse=True)
+def mock_embedding():
+    """Patch LiteLLM embeddings for every test: one mock vector per input text."""
+    with (
+        patch("litellm.get_model_info", return_value={"provider": "openai"}),
+        patch("litellm.aembedding", side_effect=mock_embedding_for_input) as mock,
+    ):
+        yield mock
+
+
+def test_encode_kb_embedding_respects_binary_flag(monkeypatch):
+    """Embeddings are stored as double arrays unless KB_VECTORS_BINARY_EMBEDDINGS is enabled."""
+    embedding = [0.5, -0.25, 1.0]
+
+    monkeypatch.delenv("KB_VECTORS_BINARY_EMBEDDINGS", raising=False)
+    assert ad.kb.encode_kb_embedding(embedding) == embedding
+
+    monkeypatch.setenv("KB_VECTORS_BINARY_EMBEDDINGS", "true")
+    encoded = ad.kb.encode_kb_embedding(embedding)
+    assert isinstance(encoded, Binary)
+    assert encoded.as_vector().data == embedding
+
+
 async def _process_pending_kb_index_messages(test_db, document_id: str | None = None):
     analytiq_client = ad.common.get_analytiq_client()
     queue_collection = test_db["queues.kb_index"]
@@ -39,16 +64,13 @@ async def _process_pending_kb_index_messages(test_db, document_id: str | None =
 
 @pytest.mark.kb_slow
 @pytest.mark.asyncio
-@patch("litellm.get_model_info", return_value={"provider": "openai"})
-@patch("litellm.aembedding")
 async def test_kb_integration_single_kb_lifecycle(
-    mock_embedding, mock_get_model_info, test_db, mock_auth, setup_test_models
+    mock_embedding, test_db, mock_auth, setup_test_models
 ):
     """
     One real KB (POST /knowledge-bases): index, reconciliation, tag change, delete cleanup, KB delete.
     Avoids listSearchIndexes / vector search (mongot); relies on collections and document_index.
     """
-    mock_embedding.return_value = create_mock_embedding_response()
 
     tag_kb = create_tag_api("Integration KB Tag")
     tag_other = create_tag_api("Integration Other Tag", color="#33AA33")
@@ -66,18 +88,10 @@ async def test_kb_integration_single_kb_lifecycle(
         # --- 1) Basic index + vectors + KB stats
         doc1 = str(ObjectId())
         text1 = "Integration test document one for knowledge base indexing. " * 10
-        await test_db.docs.insert_one(
-            {
-                "_id": ObjectId(doc1),
-                "organization_id": TEST_ORG_ID,
-                "user_file_name": "doc1.pdf",
-                "tag_ids": [tag_kb],
-                "upload_date": datetime.now(UTC),
-                "state": ad.common.doc.DOCUMENT_STATE_OCR_COMPLETED,
-                "mongo_file_name": "f1.pdf",
-            }
-        )
-        await ad.ocr.save_ocr_text(analytiq_client, doc1, text1)
+        await insert_ocr_completed_doc(
+            test_db, analytiq_client, doc1, "doc1.pdf", [tag_kb], text1,
+            mongo_file_name="f1.pdf",
+        )
         await ad.msg_handlers.process_kb_index_msg(
             analytiq_client,
             {"_id": str(ObjectId()), "msg": {"document_id": doc1, "kb_id": kb_id}},
@@ -89,6 +103,9 @@ async def test_kb_integration_single_kb_lifecycle(
         assert index_entry["chunk_count"] > 0
         vectors = test_db[f"kb_vectors_{kb_id}"]
         assert await vectors.count_documents({"document_id": doc1}) > 0
+        stored = await vectors.find_one({"document_id": doc1}, {"embedding": 1})
+        assert isinstance(stored["embedding"], list)
+        assert len(stored["embedding"]) == MOCK_EMBEDDING_DIMENSIONS
         kb = await test_db.knowledge_bases.find_one({"_id": ObjectId(kb_id)})
         assert kb["document_count"] >= 1
         assert kb["chunk_count"] >= index_entry["chunk_count"]
@@ -104,18 +121,10 @@ async def test_kb_integration_single_kb_lifecycle(
         # --- 3) Reconciliation: doc2 tagged but not indexed → missing → index after reconcile
         doc2 = str(ObjectId())
         text2 = "Document two for reconciliation. " * 10
-        await test_db.docs.insert_one(
-            {
-                "_id": ObjectId(doc2),
-                "organization_id": TEST_ORG_ID,
-                "user_file_name": "doc2.pdf",
-                "tag_ids": [tag_kb],
-                "upload_date": datetime.now(UTC),
-                "state": ad.common.doc.DOCUMENT_STATE_OCR_COMPLETED,
-                "mongo_file_name": "f2.pdf",
-            }
-        )
-        await ad.ocr.save_ocr_text(analytiq_client, doc2, text2)
+        await insert_ocr_completed_doc(
+            test_db, analytiq_client, doc2, "doc2.pdf", [tag_kb], text2,
+            mongo_file_name="f2.pdf",
+        )
 
         dry = await ad.kb.reconciliation.reconcile_knowledge_base(
             analytiq_client, TEST_ORG_ID, kb_id=kb_id, dry_run=True
@@ -180,17 +189,12 @@ async def test_kb_integration_single_kb_lifecycle(
 
 @pytest.mark.kb_slow
 @pytest.mark.asyncio
-@patch("litellm.get_model_info", return_value={"provider": "openai"})
-@patch("litellm.aembedding")
 async def test_kb_api_crud_smoke(
-    mock_embedding,
-    mock_get_model_info,
     test_db,
     mock_auth,
     setup_test_models,
 ):
     """HTTP CRUD surface for KBs (no mocking of KB core functions)."""
-    mock_embedding.return_value = create_mock_embedding_response()
     tag_id = create_tag_api("Mocked API Tag")
     kb_id = create_kb_api("Mocked API KB", [tag_id])
     try:
@@ -3,21 +3,29 @@ SPU metering for KB indexing and search: uses a KB row inserted directly (no POS
 Search tests mock vector aggregation to avoid mongot.
 """
 
+import asyncio
 import logging
 import os
-from datetime import datetime, UTC
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from bson import ObjectId
 
-from analytiq_data.kb.indexing import spus_for_kb_indexing_embedding_misses
+from analytiq_data.kb.indexing import (
+    EMBEDDING_BATCH_CONCURRENCY,
+    EMBEDDING_BATCH_SIZE,
+    Chunk,
+    get_or_generate_embeddings,
+    spus_for_kb_indexing_embedding_misses,
+)
+from analytiq_data.payments.exceptions import SPUCreditException
 
 from .conftest_utils import TEST_ORG_ID, client, get_auth_headers
 from .kb_test_helpers import (
-    create_mock_embedding_response,
     insert_minimal_kb,
+    insert_ocr_completed_doc,
     insert_org_tag,
+    mock_embedding_for_input,
 )
 import analytiq_data as ad
 
@@ -26,6 +34,31 @@ logger = logging.getLogger(__name__)
 assert os.environ["ENV"] == "pytest"
 
 
+@pytest.fixture(autouse=True)
+def mock_embedding():
+    """Patch LiteLLM embeddings for every test: one mock vector per input text."""
+    with (
+        patch("litellm.get_model_info", return_value={"provider": "openai"}),
+        patch("litellm.aembedding", side_effect=mock_embedding_for_input) as mock,
+    ):
+        yield mock
+
+
+def _assert_spu_charged(mock_check_spu_limits, mock_record_spu_usage, expected_spus: int) -> None:
+    """The org was checked for, then billed, ``expected_spus`` for the default embedding model."""
+    assert mock_check_spu_limits.called
+    check_call = mock_check_spu_limits.call_args
+    assert check_call[0][0] == TEST_ORG_ID
+    assert check_call[0][1] == expected_spus
+
+    assert mock_record_spu_usage.called
+    record_call = mock_record_spu_usage.call_args
+    assert record_call[1]["org_id"] == TEST_ORG_ID
+    assert record_call[1]["spus"] == expected_spus
+    assert record_call[1]["llm_model"] == "text-embedding-3-small"
+    assert record_call[1]["llm_provider"] == "openai"
+
+
 def test_spus_for_kb_indexing_embedding_misses_formula():
     assert spus_for_kb_indexing_embedding_misses(0) == 0
     assert spus_for_kb_indexing_embedding_misses(1) == 1
@@ -35,20 +68,145 @@ def test_spus_for_kb_indexing_embedding_misses_formula():
 
 
 @pytest.mark.asyncio
-@patch("litellm.get_model_info", return_value={"provider": "openai"})
-@patch("litellm.aembedding")
+@patch("analytiq_data.kb.indexing.store_embeddings_in_cache", new_callable=AsyncMock)
+@patch("analytiq_data.kb.indexing.get_embeddings_from_cache", new_callable=AsyncMock, return_value={})
+@patch("analytiq_data.kb.indexing.generate_embeddings_batch", new_callable=AsyncMock)
+@patch("analytiq_data.payments.record_spu_usage", new_callable=AsyncMock)
+@patch("analytiq_data.payments.check_spu_limits", new_callable=AsyncMock)
+async def test_embedding_batches_run_concurrently_and_keep_order(
+    mock_check_spu_limits,
+    mock_record_spu_usage,
+    mock_generate_batch,
+    _mock_get_cache,
+    _mock_store_cache,
+):
+    in_flight = 0
+    peak_in_flight = 0
+
+    async def fake_batch(_client, texts, _model):
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return [[float(t.split("-")[1])] for t in texts], 0.01
+
+    mock_generate_batch.side_effect = fake_batch
+    num_batches = EMBEDDING_BATCH_CONCURRENCY + 2
+    n = EMBEDDING_BATCH_SIZE * (num_batches - 1) + 5
+    chunks = [Chunk(f"chunk-{i}", i, 1, 0, 1) for i in range(n)]
+
+    embeddings, misses = await get_or_generate_embeddings(
+        object(), chunks, "text-embedding-3-small", TEST_ORG_ID
+    )
+
+    assert misses == n
+    assert mock_generate_batch.call_count == num_batches
+    assert peak_in_flight == EMBEDDING_BATCH_CONCURRENCY
+    assert embeddings == [[float(i)] for i in range(n)]
+    assert mock_record_spu_usage.call_args[1]["actual_cost"] == pytest.approx(0.01 * num_batches)
+
+
+@pytest.mark.asyncio
+@patch("analytiq_data.kb.indexing.store_embeddings_in_cache", new_callable=AsyncMock)
+@patch("analytiq_data.kb.indexing.get_embeddings_from_cache", new_callable=AsyncMock, return_value={})
+@patch("analytiq_data.kb.indexing.generate_embeddings_batch", new_callable=AsyncMock)
+@patch("analytiq_data.payments.record_spu_usage", new_callable=AsyncMock)
+@patch("analytiq_data.payments.check_spu_limits", new_callable=AsyncMock)
+async def test_failed_embedding_batch_cancels_the_rest(
+    mock_check_spu_limits,
+    mock_record_spu_usage,
+    mock_generate_batch,
+    _mock_get_cache,
+    mock_store_cache,
+):
+    finished = []
+
+    async def fake_batch(_client, texts, _model):
+        if texts[0] == "chunk-0":
+            raise RuntimeError("provider down")
+        await asyncio.sleep(1)
+        finished.append(texts[0])
+        return [[0.0] for _ in texts], 0.01
+
+    mock_generate_batch.side_effect = fake_batch
+    chunks = [Chunk(f"chunk-{i}", i, 1, 0, 1) for i in range(EMBEDDING_BATCH_SIZE * 3)]
+
+    with pytest.raises(RuntimeError, match="provider down"):
+        await get_or_generate_embeddings(object(), chunks, "text-embedding-3-small", TEST_ORG_ID)
+
+    assert finished == []
+    mock_store_cache.assert_not_called()
+    mock_record_spu_usage.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("analytiq_data.kb.indexing.store_embeddings_in_cache", new_callable=AsyncMock)
+@patch("analytiq_data.kb.indexing.get_embeddings_from_cache", new_callable=AsyncMock, return_value={})
+@patch("analytiq_data.kb.indexing.generate_embeddings_batch", new_callable=AsyncMock)
+@patch("analytiq_data.payments.record_spu_usage", new_callable=AsyncMock)
+@patch("analytiq_data.payments.check_spu_limits", new_callable=AsyncMock)
+async def test_duplicate_chunks_are_embedded_once(
+    mock_check_spu_limits,
+    mock_record_spu_usage,
+    mock_generate_batch,
+    _mock_get_cache,
+    mock_store_cache,
+):
+    async def fake_batch(_client, texts, _model):
+        return [[float(len(t))] for t in texts], 0.01
+
+    mock_generate_batch.side_effect = fake_batch
+    texts = ["header", "body one", "header", "body two", "header"]
+    chunks = [Chunk(t, i, 1, 0, 1) for i, t in enumerate(texts)]
+
+    embeddings, misses = await get_or_generate_embeddings(
+        object(), chunks, "text-embedding-3-small", TEST_ORG_ID
+    )
+
+    assert misses == 3
+    assert mock_generate_batch.call_args[0][1] == ["header", "body one", "body two"]
+    assert embeddings == [[float(len(t))] for t in texts]
+    assert len(mock_store_cache.call_args[0][1]) == 3
+
+
+@pytest.mark.asyncio
+@patch("analytiq_data.kb.indexing.store_embeddings_in_cache", new_callable=AsyncMock)
+@patch("analytiq_data.kb.indexing.get_embeddings_from_cache", new_callable=AsyncMock)
+@patch("analytiq_data.kb.indexing.generate_embeddings_batch", new_callable=AsyncMock)
+@patch("analytiq_data.payments.check_spu_limits", new_callable=AsyncMock)
+async def test_embedding_cache_lookup_is_one_batched_query(
+    mock_check_spu_limits,
+    mock_generate_batch,
+    mock_get_cache,
+    mock_store_cache,
+):
+    chunks = [Chunk(f"cached-{i}", i, 1, 0, 1) for i in range(3)]
+    mock_get_cache.return_value = {c.hash: [float(c.chunk_index)] for c in chunks}
+
+    embeddings, misses = await get_or_generate_embeddings(
+        object(), chunks, "text-embedding-3-small", TEST_ORG_ID
+    )
+
+    assert misses == 0
+    assert embeddings == [[0.0], [1.0], [2.0]]
+    mock_get_cache.assert_awaited_once()
+    assert mock_get_cache.call_args[0][1] == [c.hash for c in chunks]
+    mock_generate_batch.assert_not_called()
+    mock_check_spu_limits.assert_not_called()
+    mock_store_cache.assert_not_called()
+
+
+@pytest.mark.asyncio
 @patch("analytiq_data.payments.record_spu_usage")
 @patch("analytiq_data.payments.check_spu_limits")
 async def test_kb_indexing_spu_recording(
     mock_check_spu_limits,
     mock_record_spu_usage,
-    mock_embedding,
-    mock_get_model_info,
     test_db,
     mock_auth,
     setup_test_models,
 ):
-    mock_embedding.return_value = create_mock_embedding_response()
     mock_check_spu_limits.return_value = True
     mock_record_spu_usage.return_value = True
 
@@ -59,19 +217,10 @@ async def test_kb_indexing_spu_recording(
 
     document_id = str(ObjectId())
     test_text = "This is a test document for SPU recording. " * 20
-    await test_db.docs.insert_one(
-        {
-            "_id": ObjectId(document_id),
-            "organization_id": TEST_ORG_ID,
-            "user_file_name": "spu_test.pdf",
-            "tag_ids": [tag_id],
-            "upload_date": datetime.now(UTC),
-            "state": ad.common.doc.DOCUMENT_STATE_OCR_COMPLETED,
-            "mongo_file_name": "test_file.pdf",
-        }
-    )
     analytiq_client = ad.common.get_analytiq_client()
-    await ad.ocr.save_ocr_text(analytiq_client, document_id, test_text)
+    await insert_ocr_completed_doc(
+        test_db, analytiq_client, document_id, "spu_test.pdf", [tag_id], test_text
+    )
 
     mock_check_spu_limits.reset_mock()
     mock_record_spu_usage.reset_mock()
@@ -81,43 +230,24 @@ async def test_kb_indexing_spu_recording(
         {"_id": str(ObjectId()), "msg": {"document_id": document_id, "kb_id": kb_id}},
     )
 
-    assert mock_check_spu_limits.called
-    assert mock_record_spu_usage.called
-    check_call = mock_check_spu_limits.call_args
-    assert check_call[0][0] == TEST_ORG_ID
-    assert check_call[0][1] > 0
-
-    record_call = mock_record_spu_usage.call_args
-    assert record_call[1]["org_id"] == TEST_ORG_ID
-    assert record_call[1]["spus"] > 0
-    assert record_call[1]["llm_model"] == "text-embedding-3-small"
-    assert record_call[1]["llm_provider"] == "openai"
-
     idx = await test_db.document_index.find_one({"kb_id": kb_id, "document_id": document_id})
     assert idx is not None
-    num_chunks = idx["chunk_count"]
-    expected_spus = spus_for_kb_indexing_embedding_misses(num_chunks)
-    assert check_call[0][1] == expected_spus
-    assert record_call[1]["spus"] == expected_spus
+    expected_spus = spus_for_kb_indexing_embedding_misses(idx["chunk_count"])
+    assert expected_spus > 0
+    _assert_spu_charged(mock_check_spu_limits, mock_record_spu_usage, expected_spus)
 
 
 @pytest.mark.asyncio
-@patch("litellm.get_model_info", return_value={"provider": "openai"})
-@patch("litellm.aembedding")
 @patch("analytiq_data.payments.record_spu_usage")
 @patch("analytiq_data.payments.check_spu_limits")
 async def test_kb_indexing_spu_insufficient_credits(
     mock_check_spu_limits,
     mock_record_spu_usage,
-    mock_embedding,
-    mock_get_model_info,
     test_db,
     mock_auth,
     setup_test_models,
+    mock_embedding,
 ):
-    from app.routes.payments import SPUCreditException
-
-    mock_embedding.return_value = create_mock_embedding_response()
     mock_check_spu_limits.side_effect = SPUCreditException(TEST_ORG_ID, 10, 5)
     mock_record_spu_usage.return_value = True
 
@@ -125,20 +255,14 @@ async def test_kb_indexing_spu_insufficient_credits(
     kb_id = await insert_minimal_kb(test_db, [tag_id], name="SPU Credit KB")
 
     document_id = str(ObjectId())
-    await test_db.docs.insert_one(
-        {
-            "_id": ObjectId(document_id),
-            "organization_id": TEST_ORG_ID,
-            "user_file_name": "spu_credit_test.pdf",
-            "tag_ids": [tag_id],
-            "upload_date": datetime.now(UTC),
-            "state": ad.common.doc.DOCUMENT_STATE_OCR_COMPLETED,
-            "mongo_file_name": "test_file.pdf",
-        }
-    )
     analytiq_client = ad.common.get_analytiq_client()
-    await ad.ocr.save_ocr_text(
-        analytiq_client, document_id, "This is a test document. " * 10
+    await insert_ocr_completed_doc(
+        test_db,
+        analytiq_client,
+        document_id,
+        "spu_credit_test.pdf",
+        [tag_id],
+        "This is a test document. " * 10,
     )
 
     with pytest.raises(SPUCreditException):
@@ -147,23 +271,19 @@ async def test_kb_indexing_spu_insufficient_credits(
             {"_id": str(ObjectId()), "msg": {"document_id": document_id, "kb_id": kb_id}},
         )
     assert not mock_record_spu_usage.called
+    mock_embedding.assert_not_called()
 
 
 @pytest.mark.asyncio
-@patch("litellm.get_model_info", return_value={"provider": "openai"})
-@patch("litellm.aembedding")
 @patch("analytiq_data.payments.record_spu_usage")
 @patch("analytiq_data.payments.check_spu_limits")
 async def test_kb_indexing_spu_cache_hits_free(
     mock_check_spu_limits,
     mock_record_spu_usage,
-    mock_embedding,
-    mock_get_model_info,
     test_db,
     mock_auth,
     setup_test_models,
 ):
-    mock_embedding.return_value = create_mock_embedding_response()
     mock_check_spu_limits.return_value = True
     mock_record_spu_usage.return_value = True
 
@@ -171,20 +291,14 @@ async def test_kb_indexing_spu_cache_hits_free(
     kb_id = await insert_minimal_kb(test_db, [tag_id], name="SPU Cache KB", chunk_size=100, chunk_overlap=20)
 
     document_id = str(ObjectId())
-    await test_db.docs.insert_one(
-        {
-            "_id": ObjectId(document_id),
-            "organization_id": TEST_ORG_ID,
-            "user_file_name": "spu_cache_test.pdf",
-            "tag_ids": [tag_id],
-            "upload_date": datetime.now(UTC),
-            "state": ad.common.doc.DOCUMENT_STATE_OCR_COMPLETED,
-            "mongo_file_name": "test_file.pdf",
-        }
-    )
     analytiq_client = ad.common.get_analytiq_client()
-    await ad.ocr.save_ocr_text(
-        analytiq_client, document_id, "This is a test document for cache testing. " * 5
+    await insert_ocr_completed_doc(
+        test_db,
+        analytiq_client,
+        document_id,
+        "spu_cache_test.pdf",
+        [tag_id],
+        "This is a test document for cache testing. " * 5,
     )
 
     mock_check_spu_limits.reset_mock()
@@ -212,22 +326,17 @@ async def test_kb_indexing_spu_cache_hits_free(
 
 @pytest.mark.asyncio
 @patch("analytiq_data.kb.search._execute_vector_search_with_retry", new_callable=AsyncMock)
-@patch("litellm.get_model_info", return_value={"provider": "openai"})
-@patch("litellm.aembedding")
 @patch("analytiq_data.payments.record_spu_usage")
 @patch("analytiq_data.payments.check_spu_limits")
 async def test_kb_search_spu_recording(
     mock_check_spu_limits,
     mock_record_spu_usage,
-    mock_embedding,
-    mock_get_model_info,
     _mock_vec_exec,
     test_db,
     mock_auth,
     setup_test_models,
 ):
     _mock_vec_exec.return_value = []
-    mock_embedding.return_value = create_mock_embedding_response()
     mock_check_spu_limits.return_value = True
     mock_record_spu_usage.return_value = True
 
@@ -246,39 +355,23 @@ async def test_kb_search_spu_recording(
         top_k=5,
     )
 
-    assert mock_check_spu_limits.called
-    check_call = mock_check_spu_limits.call_args
-    assert check_call[0][0] == TEST_ORG_ID
-    assert check_call[0][1] == 1
-
-    assert mock_record_spu_usage.called
-    record_call = mock_record_spu_usage.call_args
-    assert record_call[1]["org_id"] == TEST_ORG_ID
-    assert record_call[1]["spus"] == 1
-    assert record_call[1]["llm_model"] == "text-embedding-3-small"
-    assert record_call[1]["llm_provider"] == "openai"
+    _assert_spu_charged(mock_check_spu_limits, mock_record_spu_usage, 1)
 
 
 @pytest.mark.asyncio
 @patch("analytiq_data.kb.search._execute_vector_search_with_retry", new_callable=AsyncMock)
-@patch("litellm.get_model_info", return_value={"provider": "openai"})
-@patch("litellm.aembedding")
 @patch("analytiq_data.payments.record_spu_usage")
 @patch("analytiq_data.payments.check_spu_limits")
 async def test_kb_search_spu_insufficient_credits(
     mock_check_spu_limits,
     mock_record_spu_usage,
-    mock_embedding,
-    mock_get_model_info,
     _mock_vec_exec,
     test_db,
     mock_auth,
     setup_test_models,
+    mock_embedding,
 ):
-    from app.routes.payments import SPUCreditException
-
     _mock_vec_exec.return_value = []
-    mock_embedding.return_value = create_mock_embedding_response()
     mock_check_spu_limits.side_effect = SPUCreditException(TEST_ORG_ID, 1, 0)
     mock_record_spu_usage.return_value = True
 
@@ -294,26 +387,22 @@ async def test_kb_search_spu_insufficient_credits(
             organization_id=TEST_ORG_ID,
             top_k=5,
         )
+    mock_embedding.assert_not_called()
 
 
 @pytest.mark.asyncio
 @patch("analytiq_data.kb.search._execute_vector_search_with_retry", new_callable=AsyncMock)
-@patch("litellm.get_model_info", return_value={"provider": "openai"})
-@patch("litellm.aembedding")
 @patch("analytiq_data.payments.record_spu_usage")
 @patch("analytiq_data.payments.check_spu_limits")
 async def test_kb_search_spu_cache_hit_free(
     mock_check_spu_limits,
     mock_record_spu_usage,
-    mock_embedding,
-    mock_get_model_info,
     _mock_vec_exec,
     test_db,
     mock_auth,
     setup_test_models,
 ):
     _mock_vec_exec.return_value = []
-    mock_embedding.return_value = create_mock_embedding_response()
     mock_check_spu_limits.return_value = True
     mock_record_spu_usage.return_value = True
 
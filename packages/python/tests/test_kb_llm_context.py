@@ -86,3 +86,15 @@ def test_format_no_spans_passthrough():
     out = format_kb_search_results_for_llm(results)
     assert "hello" in out
     assert "[1]" in out
+
+
+def test_format_no_spans_groups_by_document_in_rank_order():
+    results = [
+        {"content": "first", "source": "A", "document_id": "d1", "chunk_index": 0},
+        {"content": "second", "source": "B", "document_id": "d2", "chunk_index": 0},
+        {"content": "third", "source": "A", "document_id": "d1", "chunk_index": 3},
+    ]
+    out = format_kb_search_results_for_llm(results)
+    assert "[1] first" in out
+    assert "[2] third" in out
+    assert "[3] second" in out
@@ -4,11 +4,18 @@ from unittest.mock import patch
 
 import pytest
 from bson import ObjectId
+from bson.binary import Binary
 
 import analytiq_data as ad
 
 from .conftest_utils import TEST_ORG_ID, client, get_auth_headers
-from .kb_test_helpers import create_kb_api, create_mock_embedding_response, create_tag_api, delete_kb_api
+from .kb_test_helpers import (
+    create_kb_api,
+    create_mock_embedding_response,
+    create_tag_api,
+    delete_kb_api,
+    insert_ocr_completed_doc,
+)
 
 
 @pytest.mark.kb_slow
@@ -75,3 +82,70 @@ async def test_kb_search_http_endpoint_returns_results_with_mongot(
         assert last.json().get("results"), "Expected non-empty results from mongot vector search"
     finally:
         delete_kb_api(kb_id)
+
+
+@pytest.mark.kb_slow
+@pytest.mark.mongot
+@pytest.mark.asyncio
+@patch("litellm.get_model_info", return_value={"provider": "openai"})
+@patch("litellm.aembedding")
+async def test_kb_search_with_mixed_embedding_encodings(
+    mock_embedding,
+    _mock_get_model_info,
+    test_db,
+    mock_auth,
+    setup_test_models,
+    monkeypatch,
+):
+    """
+    A KB indexed before and after KB_VECTORS_BINARY_EMBEDDINGS was enabled holds both double-array
+    and BinData float32 embeddings; $vectorSearch must return chunks of both encodings.
+    """
+    mock_embedding.return_value = create_mock_embedding_response()
+
+    tag_id = create_tag_api("Mongot Mixed Encoding Tag")
+    kb_id = create_kb_api("Mongot Mixed Encoding KB", [tag_id])
+
+    analytiq_client = ad.common.get_analytiq_client()
+    array_doc_id = str(ObjectId())
+    binary_doc_id = str(ObjectId())
+    vectors = test_db[f"kb_vectors_{kb_id}"]
+
+    try:
+        for doc_id, binary_enabled in ((array_doc_id, "false"), (binary_doc_id, "true")):
+            monkeypatch.setenv("KB_VECTORS_BINARY_EMBEDDINGS", binary_enabled)
+            await insert_ocr_completed_doc(
+                test_db,
+                analytiq_client,
+                doc_id,
+                f"doc_{binary_enabled}.pdf",
+                [tag_id],
+                "This is a mongot-backed search integration test about invoices and totals.",
+            )
+            await ad.msg_handlers.process_kb_index_msg(
+                analytiq_client,
+                {"_id": str(ObjectId()), "msg": {"document_id": doc_id, "kb_id": kb_id}},
+            )
+
+        array_vector = await vectors.find_one({"document_id": array_doc_id}, {"embedding": 1})
+        binary_vector = await vectors.find_one({"document_id": binary_doc_id}, {"embedding": 1})
+        assert isinstance(array_vector["embedding"], list)
+        assert isinstance(binary_vector["embedding"], Binary)
+
+        # Search indexes can take a moment to build; retry until both documents are returned.
+        found = set()
+        for _ in range(30):
+            resp = client.post(
+                f"/v0/orgs/{TEST_ORG_ID}/knowledge-bases/{kb_id}/search",
+                json={"query": "invoice totals", "top_k": 10},
+                headers=get_auth_headers(),
+            )
+            if resp.status_code == 200:
+                found = {r["document_id"] for r in resp.json().get("results", [])}
+                if {array_doc_id, binary_doc_id} <= found:
+                    break
+            await asyncio.sleep(1)
+
+        assert {array_doc_id, binary_doc_id} <= found, f"Expected results from both encodings, got {found}"
+    finally:
+        delete_kb_api(kb_id)
@@ -7,10 +7,20 @@ import pytest
 from bson import ObjectId
 import os
 import logging
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException
+from pymongo.errors import OperationFailure
+
+import analytiq_data as ad
+from app.routes.knowledge_bases import (
+    INITIAL_INDEX_POLL_INTERVAL,
+    create_vector_search_index,
+    wait_for_vector_index_ready,
+)
 
 from .conftest_utils import client, TEST_ORG_ID, get_auth_headers
-from .kb_test_helpers import create_mock_embedding_response
+from .kb_test_helpers import mock_embedding_for_input
 
 logger = logging.getLogger(__name__)
 
@@ -20,20 +30,30 @@ MOCK_SEARCH_INDEX = patch(
     "app.routes.knowledge_bases.create_vector_search_index",
     new_callable=AsyncMock,
 )
-MOCK_EMBEDDING = patch("litellm.aembedding")
-MOCK_MODEL_INFO = patch(
-    "litellm.get_model_info", return_value={"provider": "openai"}
-)
 
 
-def _apply_embedding_mock(mock_embedding):
-    mock_embedding.return_value = create_mock_embedding_response()
+@pytest.fixture(autouse=True)
+def mock_litellm():
+    """Patch LiteLLM model info and embeddings for every test (KB create probes the model)."""
+    with (
+        patch("litellm.get_model_info", return_value={"provider": "openai"}),
+        patch("litellm.aembedding", side_effect=mock_embedding_for_input) as mock_embedding,
+    ):
+        yield mock_embedding
 
 
 # ── helpers ──────────────────────────────────────────────────────────
 
+def _post_kb(payload):
+    return client.post(
+        f"/v0/orgs/{TEST_ORG_ID}/knowledge-bases",
+        json=payload,
+        headers=get_auth_headers(),
+    )
+
+
 def _create_kb(name="Test KB", **overrides):
-    payload = {
+    return _post_kb({
         "name": name,
         "tag_ids": [],
         "chunker_type": "recursive",
@@ -41,13 +61,7 @@ def _create_kb(name="Test KB", **overrides):
         "chunk_overlap": 128,
         "embedding_model": "text-embedding-3-small",
         **overrides,
-    }
-    r = client.post(
-        f"/v0/orgs/{TEST_ORG_ID}/knowledge-bases",
-        json=payload,
-        headers=get_auth_headers(),
-    )
-    return r
+    })
 
 
 def _delete_kb(kb_id):
@@ -61,12 +75,8 @@ def _delete_kb(kb_id):
 
 @pytest.mark.asyncio
 @MOCK_SEARCH_INDEX
-@MOCK_MODEL_INFO
-@MOCK_EMBEDDING
-async def test_kb_lifecycle(mock_embedding, _mock_model_info, _mock_idx, test_db, mock_auth, setup_test_models):
+async def test_kb_lifecycle(_mock_idx, test_db, mock_auth, setup_test_models):
     """Full CRUD lifecycle: create → list → get → update → delete → verify gone."""
-    _apply_embedding_mock(mock_embedding)
-
     resp = _create_kb(
         name="Test Invoice KB",
         description="Knowledge base for invoice processing",
@@ -140,21 +150,14 @@ async def test_kb_create_validation(test_db, mock_auth, setup_test_models):
         {"name": "X", "coalesce_neighbors": 10},
     ]
     for payload in cases:
-        r = client.post(
-            f"/v0/orgs/{TEST_ORG_ID}/knowledge-bases",
-            json=payload,
-            headers=get_auth_headers(),
-        )
+        r = _post_kb(payload)
         assert r.status_code == 422, f"Expected 422 for {payload}, got {r.status_code}"
 
 
 @pytest.mark.asyncio
 @MOCK_SEARCH_INDEX
-@MOCK_MODEL_INFO
-@MOCK_EMBEDDING
-async def test_kb_list_pagination(mock_embedding, _mock_model_info, _mock_idx, test_db, mock_auth, setup_test_models):
+async def test_kb_list_pagination(_mock_idx, test_db, mock_auth, setup_test_models):
     """Pagination (skip/limit) and name search."""
-    _apply_embedding_mock(mock_embedding)
     kb_ids = []
 
     try:
@@ -186,12 +189,8 @@ async def test_kb_list_pagination(mock_embedding, _mock_model_info, _mock_idx, t
 
 @pytest.mark.asyncio
 @MOCK_SEARCH_INDEX
-@MOCK_MODEL_INFO
-@MOCK_EMBEDDING
-async def test_kb_documents_list(mock_embedding, _mock_model_info, _mock_idx, test_db, mock_auth, setup_test_models):
+async def test_kb_documents_list(_mock_idx, test_db, mock_auth, setup_test_models):
     """Listing documents on a fresh KB returns empty."""
-    _apply_embedding_mock(mock_embedding)
-
     r = _create_kb(name="Test KB for Documents")
     assert r.status_code == 200
     kb_id = r.json()["kb_id"]
@@ -210,12 +209,8 @@ async def test_kb_documents_list(mock_embedding, _mock_model_info, _mock_idx, te
 
 @pytest.mark.asyncio
 @MOCK_SEARCH_INDEX
-@MOCK_MODEL_INFO
-@MOCK_EMBEDDING
-async def test_kb_search(mock_embedding, _mock_model_info, _mock_idx, test_db, mock_auth, setup_test_models):
+async def test_kb_search(_mock_idx, test_db, mock_auth, setup_test_models):
     """Search on an empty KB returns zero results."""
-    _apply_embedding_mock(mock_embedding)
-
     r = _create_kb(name="Test Search KB")
     assert r.status_code == 200
     kb_id = r.json()["kb_id"]
@@ -236,11 +231,8 @@ async def test_kb_search(mock_embedding, _mock_model_info, _mock_idx, test_db, m
 
 @pytest.mark.asyncio
 @MOCK_SEARCH_INDEX
-@MOCK_MODEL_INFO
-@MOCK_EMBEDDING
-async def test_kb_chat_thread_crud(mock_embedding, _mock_model_info, _mock_idx, test_db, mock_auth, setup_test_models):
+async def test_kb_chat_thread_crud(_mock_idx, test_db, mock_auth, setup_test_models):
     """List / create / get / delete KB chat threads (scoped to kb_id)."""
-    _apply_embedding_mock(mock_embedding)
     r = _create_kb(name="Thread KB")
     assert r.status_code == 200
     kb_id = r.json()["kb_id"]
@@ -306,12 +298,8 @@ async def test_kb_not_found_errors(test_db, mock_auth, setup_test_models):
 
 @pytest.mark.asyncio
 @MOCK_SEARCH_INDEX
-@MOCK_MODEL_INFO
-@MOCK_EMBEDDING
-async def test_kb_immutable_fields(mock_embedding, _mock_model_info, _mock_idx, test_db, mock_auth, setup_test_models):
+async def test_kb_immutable_fields(_mock_idx, test_db, mock_auth, setup_test_models):
     """embedding_model is immutable; chunker_type, chunk_size are mutable."""
-    _apply_embedding_mock(mock_embedding)
-
     r = _create_kb(
         name="Test Immutable KB",
         chunker_type="recursive",
@@ -341,3 +329,37 @@ async def test_kb_immutable_fields(mock_embedding, _mock_model_info, _mock_idx,
         assert updated["embedding_model"] == "text-embedding-3-small"  # unchanged
     finally:
         _delete_kb(kb_id)
+
+
+@pytest.mark.asyncio
+async def test_wait_for_vector_index_ready_backs_off_between_polls():
+    statuses = [[], [{"status": "PENDING", "queryable": False}], [{"status": "READY", "queryable": True}]]
+    collection = MagicMock()
+    collection.list_search_indexes.side_effect = lambda **_: MagicMock(
+        to_list=AsyncMock(return_value=statuses.pop(0))
+    )
+    analytiq_client = MagicMock()
+    analytiq_client.mongodb_async.__getitem__.return_value.__getitem__.return_value = collection
+
+    with patch("app.routes.knowledge_bases.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await wait_for_vector_index_ready(analytiq_client, kb_id="kb", embedding_dimensions=1536)
+
+    delays = [c.args[0] for c in mock_sleep.await_args_list]
+    assert delays == [INITIAL_INDEX_POLL_INTERVAL, INITIAL_INDEX_POLL_INTERVAL * 2]
+
+
+@pytest.mark.asyncio
+async def test_create_vector_search_index_fails_when_collection_cannot_be_created():
+    db = MagicMock()
+    db.create_collection = AsyncMock(side_effect=OperationFailure("not authorized", code=13))
+    db.command = AsyncMock()
+
+    with patch("app.routes.knowledge_bases.ad.common.get_async_db", return_value=db):
+        with pytest.raises(HTTPException) as exc_info:
+            await create_vector_search_index(None, "kb1", 1536, TEST_ORG_ID)
+
+    assert exc_info.value.status_code == 500
+    db.create_collection.assert_awaited_once_with(
+        "kb_vectors_kb1", storageEngine=ad.mongodb.KB_VECTORS_STORAGE_ENGINE
+    )
+    db.command.assert_not_awaited()
@@ -11,6 +11,7 @@ Tests cover:
 """
 
 import pytest
+import asyncio
 import os
 import json
 import base64
@@ -39,12 +40,52 @@ MOCK_OCR_TEXT_FOR_TESTS = (
     "Vendor: Acme Corp"
 )
 
+# Stub PDF uploaded by every test, as the data URL the documents API takes
+MOCK_PDF_DATA_URL = "data:application/pdf;base64," + base64.b64encode(
+    b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
+).decode()
+
 
 async def seed_mock_ocr_for_unit_test(analytiq_client, document_id: str) -> None:
     """Simulate completed OCR for unit tests (no process_ocr_msg / no AWS)."""
     await ad.ocr.save_ocr_text(analytiq_client, document_id, MOCK_OCR_TEXT_FOR_TESTS)
 
 
+def create_prompt_api(name: str, content: str, tag_id: str, kb_id: str | None = None, model: str = "gpt-4o") -> str:
+    """Create a prompt for tag_id (optionally KB-enabled) via HTTP. Returns prompt_revid."""
+    prompt_data = {
+        "name": name,
+        "content": content,
+        "model": model,
+        "tag_ids": [tag_id],
+    }
+    if kb_id:
+        prompt_data["kb_id"] = kb_id
+    prompt_response = client.post(
+        f"/v0/orgs/{TEST_ORG_ID}/prompts",
+        json=prompt_data,
+        headers=get_auth_headers()
+    )
+    assert prompt_response.status_code == 200, f"Prompt creation failed: {prompt_response.text}"
+    return prompt_response.json()["prompt_revid"]
+
+
+async def upload_seeded_document(analytiq_client, tag_id: str) -> str:
+    """Upload a minimal PDF tagged with tag_id and seed its OCR text. Returns document_id."""
+    upload_data = {
+        "documents": [{
+            "name": "test_doc.pdf",
+            "content": MOCK_PDF_DATA_URL,
+            "tag_ids": [tag_id]
+        }]
+    }
+    upload_resp = client.post(f"/v0/orgs/{TEST_ORG_ID}/documents", json=upload_data, headers=get_auth_headers())
+    assert upload_resp.status_code == 200, f"Document upload failed: {upload_resp.text}"
+    document_id = upload_resp.json()["documents"][0]["document_id"]
+    await seed_mock_ocr_for_unit_test(analytiq_client, document_id)
+    return document_id
+
+
 class MockToolCall:
     """Mock tool call object"""
     def __init__(self, tool_call_id, function_name, function_arguments):
@@ -96,7 +137,19 @@ class MockUsage:
         self.total_tokens = prompt_tokens + completion_tokens
 
 
-async def create_mock_kb_search_results(num_results=3):
+@pytest.fixture(autouse=True)
+def stable_llm_patches():
+    """Patch the LiteLLM cost/capability checks and file upload that every run_llm test shares."""
+    with (
+        patch('analytiq_data.llm.llm._litellm_acreate_file_with_retry', new=mock_litellm_acreate_file_with_retry),
+        patch('litellm.completion_cost', return_value=0.001),
+        patch('litellm.supports_response_schema', return_value=True),
+        patch('litellm.utils.supports_pdf_input', return_value=True),
+    ):
+        yield
+
+
+def create_mock_kb_search_results(num_results=3):
     """Create mock KB search results"""
     return {
         "results": [
@@ -125,42 +178,20 @@ async def test_llm_with_kb_agentic_loop_single_tool_call(mock_embedding, mock_ge
     # Set up mock embedding response for KB creation
     mock_embedding.return_value = create_mock_embedding_response()
     
-    org_id = TEST_ORG_ID
     tag_id, kb_id, analytiq_client = await create_active_kb_api(
         "KB Test Tag", "Test KB", chunk_size=512, chunk_overlap=128
     )
 
-    # Create prompt with KB
-    prompt_data = {
-        "name": "KB Test Prompt",
-        "content": "Extract information from this document. Use the knowledge base if needed.",
-        "model": "gpt-4o",
-        "tag_ids": [tag_id],
-        "kb_id": kb_id
-    }
-    prompt_response = client.post(
-        f"/v0/orgs/{org_id}/prompts",
-        json=prompt_data,
-        headers=get_auth_headers()
+    prompt_revid = create_prompt_api(
+        "KB Test Prompt",
+        "Extract information from this document. Use the knowledge base if needed.",
+        tag_id,
+        kb_id=kb_id,
     )
-    prompt_revid = prompt_response.json()["prompt_revid"]
-    
-    # Create document
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
-    upload_data = {
-        "documents": [{
-            "name": "test_doc.pdf",
-            "content": f"data:application/pdf;base64,{base64.b64encode(pdf_content).decode()}",
-            "tag_ids": [tag_id]
-        }]
-    }
-    upload_resp = client.post(f"/v0/orgs/{org_id}/documents", json=upload_data, headers=get_auth_headers())
-    document_id = upload_resp.json()["documents"][0]["document_id"]
-    
-    await seed_mock_ocr_for_unit_test(analytiq_client, document_id)
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
     
     # Mock KB search results
-    mock_kb_results = await create_mock_kb_search_results(3)
+    mock_kb_results = create_mock_kb_search_results(3)
     mock_kb_search = AsyncMock(return_value=mock_kb_results)
     
     # Create mock LLM responses: first with tool call, then final response
@@ -182,11 +213,7 @@ async def test_llm_with_kb_agentic_loop_single_tool_call(mock_embedding, mock_ge
     
     with (
         patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
-        patch('analytiq_data.llm.llm._litellm_acreate_file_with_retry', new=mock_litellm_acreate_file_with_retry),
         patch('analytiq_data.kb.search.search_knowledge_base', new=mock_kb_search),
-        patch('litellm.completion_cost', return_value=0.001),
-        patch('litellm.supports_response_schema', return_value=True),
-        patch('litellm.utils.supports_pdf_input', return_value=True),
         patch('litellm.supports_function_calling', return_value=True),
     ):
         # Run LLM
@@ -234,42 +261,20 @@ async def test_llm_with_kb_multiple_tool_calls(mock_embedding, mock_get_model_in
     # Set up mock embedding response for KB creation
     mock_embedding.return_value = create_mock_embedding_response()
     
-    org_id = TEST_ORG_ID
     tag_id, kb_id, analytiq_client = await create_active_kb_api(
         "KB Multi Test Tag", "Multi Test KB", chunk_size=512, chunk_overlap=128
     )
 
-    # Create prompt with KB
-    prompt_data = {
-        "name": "KB Multi Test Prompt",
-        "content": "Extract information. Search KB multiple times if needed.",
-        "model": "gpt-4o",
-        "tag_ids": [tag_id],
-        "kb_id": kb_id
-    }
-    prompt_response = client.post(
-        f"/v0/orgs/{org_id}/prompts",
-        json=prompt_data,
-        headers=get_auth_headers()
+    prompt_revid = create_prompt_api(
+        "KB Multi Test Prompt",
+        "Extract information. Search KB multiple times if needed.",
+        tag_id,
+        kb_id=kb_id,
     )
-    prompt_revid = prompt_response.json()["prompt_revid"]
-    
-    # Create document
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
-    upload_data = {
-        "documents": [{
-            "name": "test_doc.pdf",
-            "content": f"data:application/pdf;base64,{base64.b64encode(pdf_content).decode()}",
-            "tag_ids": [tag_id]
-        }]
-    }
-    upload_resp = client.post(f"/v0/orgs/{org_id}/documents", json=upload_data, headers=get_auth_headers())
-    document_id = upload_resp.json()["documents"][0]["document_id"]
-    
-    await seed_mock_ocr_for_unit_test(analytiq_client, document_id)
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
     
     # Mock KB search results
-    mock_kb_results = await create_mock_kb_search_results(3)
+    mock_kb_results = create_mock_kb_search_results(3)
     mock_kb_search = AsyncMock(return_value=mock_kb_results)
     
     # Create mock LLM responses: 2 tool calls, then final response
@@ -298,11 +303,7 @@ async def test_llm_with_kb_multiple_tool_calls(mock_embedding, mock_get_model_in
     
     with (
         patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
-        patch('analytiq_data.llm.llm._litellm_acreate_file_with_retry', new=mock_litellm_acreate_file_with_retry),
         patch('analytiq_data.kb.search.search_knowledge_base', new=mock_kb_search),
-        patch('litellm.completion_cost', return_value=0.001),
-        patch('litellm.supports_response_schema', return_value=True),
-        patch('litellm.utils.supports_pdf_input', return_value=True),
         patch('litellm.supports_function_calling', return_value=True),
     ):
         # Run LLM
@@ -324,6 +325,170 @@ async def test_llm_with_kb_multiple_tool_calls(mock_embedding, mock_get_model_in
     delete_kb_api(kb_id)
 
 
+@pytest.mark.asyncio
+@patch('litellm.get_model_info', return_value={"provider": "openai"})
+@patch('litellm.aembedding')
+async def test_llm_with_kb_parallel_tool_calls(mock_embedding, mock_get_model_info, test_db, mock_auth, setup_test_models):
+    """Test LLM with KB - tool calls in one assistant message run concurrently"""
+    # Set up mock embedding response for KB creation
+    mock_embedding.return_value = create_mock_embedding_response()
+    
+    tag_id, kb_id, analytiq_client = await create_active_kb_api(
+        "KB Parallel Test Tag", "Parallel Test KB", chunk_size=512, chunk_overlap=128
+    )
+
+    prompt_revid = create_prompt_api(
+        "KB Parallel Test Prompt",
+        "Extract information. Search KB multiple times if needed.",
+        tag_id,
+        kb_id=kb_id,
+    )
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
+    
+    # Each search waits until both have started, so a sequential loop would time out
+    mock_kb_results = create_mock_kb_search_results(3)
+    searches_started = []
+    both_started = asyncio.Event()
+
+    async def gated_kb_search(**kwargs):
+        searches_started.append(kwargs["query"])
+        if len(searches_started) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=5)
+        return mock_kb_results
+
+    mock_kb_search = AsyncMock(side_effect=gated_kb_search)
+    
+    # Create mock LLM responses: one message with 2 tool calls, then final response
+    tool_call_1 = MockToolCall("call_1", "search_knowledge_base", {"query": "first search", "top_k": 5})
+    tool_call_2 = MockToolCall("call_2", "search_knowledge_base", {"query": "second search", "top_k": 5})
+    
+    first_response = MockLLMResponseWithToolCalls(
+        content=None,
+        tool_calls=[tool_call_1, tool_call_2],
+        usage=MockUsage(prompt_tokens=100, completion_tokens=50)
+    )
+    
+    final_response = MockLLMResponseWithToolCalls(
+        content=json.dumps({"result": "extracted with parallel KB help"}),
+        tool_calls=None,
+        usage=MockUsage(prompt_tokens=200, completion_tokens=100)
+    )
+    
+    mock_acompletion = AsyncMock(side_effect=[first_response, final_response])
+    
+    with (
+        patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
+        patch('analytiq_data.kb.search.search_knowledge_base', new=mock_kb_search),
+        patch('analytiq_data.payments.check_spu_limits', new=AsyncMock(return_value=True)),
+        patch('litellm.supports_function_calling', return_value=True),
+    ):
+        # Run LLM
+        result = await ad.llm.run_llm(analytiq_client, document_id, prompt_revid)
+        
+        # Verify result
+        assert result["result"] == "extracted with parallel KB help"
+        
+        # Verify LLM was called twice (one tool call turn + final response)
+        assert mock_acompletion.call_count == 2
+        
+        # Verify both searches ran, and both started before either finished
+        assert mock_kb_search.call_count == 2
+        assert both_started.is_set()
+        
+        # Verify tool responses follow the tool_calls order and carry results, not errors
+        messages = mock_acompletion.call_args_list[1][1]["messages"]
+        tool_messages = [m for m in messages if m.get("role") == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_1", "call_2"]
+        assert all("Error searching knowledge base" not in m["content"] for m in tool_messages)
+    
+    # Cleanup
+    delete_kb_api(kb_id)
+
+
+@pytest.mark.asyncio
+@patch('litellm.get_model_info', return_value={"provider": "openai"})
+@patch('litellm.aembedding')
+async def test_llm_with_kb_parallel_tool_calls_spu_limit(mock_embedding, mock_get_model_info, test_db, mock_auth, setup_test_models):
+    """Test LLM with KB - when the org can afford only one of two parallel searches, only one is charged"""
+    mock_embedding.return_value = create_mock_embedding_response()
+
+    tag_id, kb_id, analytiq_client = await create_active_kb_api(
+        "KB SPU Limit Test Tag", "SPU Limit Test KB", chunk_size=512, chunk_overlap=128
+    )
+
+    prompt_revid = create_prompt_api(
+        "KB SPU Limit Test Prompt",
+        "Extract information. Search KB multiple times if needed.",
+        tag_id,
+        kb_id=kb_id,
+    )
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
+
+    # The org has 1 SPU left; each search checks for 1 SPU, yields, then records it
+    credits = {"available": 1}
+    recorded_spus = []
+
+    async def limited_check_spu_limits(org_id, spus):
+        if spus > credits["available"]:
+            raise ad.payments.SPUCreditException(org_id, spus, credits["available"])
+        return True
+
+    async def limited_record_spu_usage(org_id, spus, **kwargs):
+        credits["available"] -= spus
+        recorded_spus.append(spus)
+        return True
+
+    mock_kb_results = create_mock_kb_search_results(3)
+
+    async def charged_kb_search(**kwargs):
+        await ad.payments.check_spu_limits(kwargs["organization_id"], 1)
+        await asyncio.sleep(0)
+        await ad.payments.record_spu_usage(org_id=kwargs["organization_id"], spus=1)
+        return mock_kb_results
+
+    tool_call_1 = MockToolCall("call_1", "search_knowledge_base", {"query": "first search", "top_k": 5})
+    tool_call_2 = MockToolCall("call_2", "search_knowledge_base", {"query": "second search", "top_k": 5})
+
+    first_response = MockLLMResponseWithToolCalls(
+        content=None,
+        tool_calls=[tool_call_1, tool_call_2],
+        usage=MockUsage(prompt_tokens=100, completion_tokens=50)
+    )
+
+    final_response = MockLLMResponseWithToolCalls(
+        content=json.dumps({"result": "extracted with one KB search"}),
+        tool_calls=None,
+        usage=MockUsage(prompt_tokens=200, completion_tokens=100)
+    )
+
+    mock_acompletion = AsyncMock(side_effect=[first_response, final_response])
+
+    with (
+        patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
+        patch('analytiq_data.kb.search.search_knowledge_base', new=AsyncMock(side_effect=charged_kb_search)),
+        patch('analytiq_data.payments.check_spu_limits', new=limited_check_spu_limits),
+        patch('analytiq_data.payments.record_spu_usage', new=limited_record_spu_usage),
+        patch('litellm.supports_function_calling', return_value=True),
+    ):
+        result = await ad.llm.run_llm(analytiq_client, document_id, prompt_revid)
+
+        assert result["result"] == "extracted with one KB search"
+
+        # Only the affordable search was charged; the other got an insufficient-credits error
+        assert recorded_spus == [1]
+        assert credits["available"] == 0
+
+        messages = mock_acompletion.call_args_list[1][1]["messages"]
+        tool_messages = [m for m in messages if m.get("role") == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_1", "call_2"]
+        assert "Error searching knowledge base" not in tool_messages[0]["content"]
+        assert "Insufficient SPU credits" in tool_messages[1]["content"]
+
+    # Cleanup
+    delete_kb_api(kb_id)
+
+
 @pytest.mark.asyncio
 @patch('litellm.get_model_info', return_value={"provider": "openai"})
 @patch('litellm.aembedding')
@@ -332,40 +497,19 @@ async def test_llm_with_kb_model_no_function_calling(mock_embedding, mock_get_mo
     # Set up mock embedding response for KB creation
     mock_embedding.return_value = create_mock_embedding_response()
     
-    org_id = TEST_ORG_ID
     tag_id, kb_id, analytiq_client = await create_active_kb_api(
         "KB No FC Test Tag", "No FC Test KB", chunk_size=512, chunk_overlap=128
     )
 
-    # Create prompt with KB
-    prompt_data = {
-        "name": "KB No FC Test Prompt",
-        "content": "Extract information from this document.",
-        "model": "gpt-4o-mini",  # Use enabled model, but we'll mock supports_function_calling to return False
-        "tag_ids": [tag_id],
-        "kb_id": kb_id
-    }
-    prompt_response = client.post(
-        f"/v0/orgs/{org_id}/prompts",
-        json=prompt_data,
-        headers=get_auth_headers()
+    # Enabled model, but we'll mock supports_function_calling to return False
+    prompt_revid = create_prompt_api(
+        "KB No FC Test Prompt",
+        "Extract information from this document.",
+        tag_id,
+        kb_id=kb_id,
+        model="gpt-4o-mini",
     )
-    assert prompt_response.status_code == 200, f"Prompt creation failed: {prompt_response.text}"
-    prompt_revid = prompt_response.json()["prompt_revid"]
-    
-    # Create document
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
-    upload_data = {
-        "documents": [{
-            "name": "test_doc.pdf",
-            "content": f"data:application/pdf;base64,{base64.b64encode(pdf_content).decode()}",
-            "tag_ids": [tag_id]
-        }]
-    }
-    upload_resp = client.post(f"/v0/orgs/{org_id}/documents", json=upload_data, headers=get_auth_headers())
-    document_id = upload_resp.json()["documents"][0]["document_id"]
-    
-    await seed_mock_ocr_for_unit_test(analytiq_client, document_id)
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
     
     # Mock LLM response (no tool calls, just regular response)
     final_response = MockLLMResponseWithToolCalls(
@@ -379,11 +523,7 @@ async def test_llm_with_kb_model_no_function_calling(mock_embedding, mock_get_mo
     
     with (
         patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
-        patch('analytiq_data.llm.llm._litellm_acreate_file_with_retry', new=mock_litellm_acreate_file_with_retry),
         patch('analytiq_data.kb.search.search_knowledge_base', new=mock_kb_search),
-        patch('litellm.completion_cost', return_value=0.001),
-        patch('litellm.supports_response_schema', return_value=True),
-        patch('litellm.utils.supports_pdf_input', return_value=True),
         patch('litellm.supports_function_calling', return_value=False),  # Model doesn't support function calling
     ):
         # Run LLM
@@ -415,39 +555,17 @@ async def test_llm_with_kb_search_error_handling(mock_embedding, mock_get_model_
     # Set up mock embedding response for KB creation
     mock_embedding.return_value = create_mock_embedding_response()
     
-    org_id = TEST_ORG_ID
     tag_id, kb_id, analytiq_client = await create_active_kb_api(
         "KB Error Test Tag", "Error Test KB", chunk_size=512, chunk_overlap=128
     )
 
-    # Create prompt with KB
-    prompt_data = {
-        "name": "KB Error Test Prompt",
-        "content": "Extract information from this document.",
-        "model": "gpt-4o",
-        "tag_ids": [tag_id],
-        "kb_id": kb_id
-    }
-    prompt_response = client.post(
-        f"/v0/orgs/{org_id}/prompts",
-        json=prompt_data,
-        headers=get_auth_headers()
+    prompt_revid = create_prompt_api(
+        "KB Error Test Prompt",
+        "Extract information from this document.",
+        tag_id,
+        kb_id=kb_id,
     )
-    prompt_revid = prompt_response.json()["prompt_revid"]
-    
-    # Create document
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
-    upload_data = {
-        "documents": [{
-            "name": "test_doc.pdf",
-            "content": f"data:application/pdf;base64,{base64.b64encode(pdf_content).decode()}",
-            "tag_ids": [tag_id]
-        }]
-    }
-    upload_resp = client.post(f"/v0/orgs/{org_id}/documents", json=upload_data, headers=get_auth_headers())
-    document_id = upload_resp.json()["documents"][0]["document_id"]
-    
-    await seed_mock_ocr_for_unit_test(analytiq_client, document_id)
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
     
     # Mock KB search to raise an error
     mock_kb_search = AsyncMock(side_effect=Exception("KB search failed"))
@@ -470,11 +588,7 @@ async def test_llm_with_kb_search_error_handling(mock_embedding, mock_get_model_
     
     with (
         patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
-        patch('analytiq_data.llm.llm._litellm_acreate_file_with_retry', new=mock_litellm_acreate_file_with_retry),
         patch('analytiq_data.kb.search.search_knowledge_base', new=mock_kb_search),
-        patch('litellm.completion_cost', return_value=0.001),
-        patch('litellm.supports_response_schema', return_value=True),
-        patch('litellm.utils.supports_pdf_input', return_value=True),
         patch('litellm.supports_function_calling', return_value=True),
     ):
         # Run LLM - should handle error gracefully
@@ -511,42 +625,20 @@ async def test_llm_with_kb_max_iterations(mock_embedding, mock_get_model_info, t
     # Set up mock embedding response for KB creation
     mock_embedding.return_value = create_mock_embedding_response()
     
-    org_id = TEST_ORG_ID
     tag_id, kb_id, analytiq_client = await create_active_kb_api(
         "KB Max Iter Test Tag", "Max Iter Test KB", chunk_size=512, chunk_overlap=128
     )
 
-    # Create prompt with KB
-    prompt_data = {
-        "name": "KB Max Iter Test Prompt",
-        "content": "Extract information from this document.",
-        "model": "gpt-4o",
-        "tag_ids": [tag_id],
-        "kb_id": kb_id
-    }
-    prompt_response = client.post(
-        f"/v0/orgs/{org_id}/prompts",
-        json=prompt_data,
-        headers=get_auth_headers()
+    prompt_revid = create_prompt_api(
+        "KB Max Iter Test Prompt",
+        "Extract information from this document.",
+        tag_id,
+        kb_id=kb_id,
     )
-    prompt_revid = prompt_response.json()["prompt_revid"]
-    
-    # Create document
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
-    upload_data = {
-        "documents": [{
-            "name": "test_doc.pdf",
-            "content": f"data:application/pdf;base64,{base64.b64encode(pdf_content).decode()}",
-            "tag_ids": [tag_id]
-        }]
-    }
-    upload_resp = client.post(f"/v0/orgs/{org_id}/documents", json=upload_data, headers=get_auth_headers())
-    document_id = upload_resp.json()["documents"][0]["document_id"]
-    
-    await seed_mock_ocr_for_unit_test(analytiq_client, document_id)
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
     
     # Mock KB search results
-    mock_kb_results = await create_mock_kb_search_results(3)
+    mock_kb_results = create_mock_kb_search_results(3)
     mock_kb_search = AsyncMock(return_value=mock_kb_results)
     
     # Create mock LLM responses: always return tool calls (to hit max iterations)
@@ -562,11 +654,7 @@ async def test_llm_with_kb_max_iterations(mock_embedding, mock_get_model_info, t
     
     with (
         patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
-        patch('analytiq_data.llm.llm._litellm_acreate_file_with_retry', new=mock_litellm_acreate_file_with_retry),
         patch('analytiq_data.kb.search.search_knowledge_base', new=mock_kb_search),
-        patch('litellm.completion_cost', return_value=0.001),
-        patch('litellm.supports_response_schema', return_value=True),
-        patch('litellm.utils.supports_pdf_input', return_value=True),
         patch('litellm.supports_function_calling', return_value=True),
     ):
         # Run LLM - should hit max iterations
@@ -595,42 +683,20 @@ async def test_llm_with_kb_token_accumulation(mock_embedding, mock_get_model_inf
     # Set up mock embedding response for KB creation
     mock_embedding.return_value = create_mock_embedding_response()
     
-    org_id = TEST_ORG_ID
     tag_id, kb_id, analytiq_client = await create_active_kb_api(
         "KB Token Test Tag", "Token Test KB", chunk_size=512, chunk_overlap=128
     )
 
-    # Create prompt with KB
-    prompt_data = {
-        "name": "KB Token Test Prompt",
-        "content": "Extract information from this document.",
-        "model": "gpt-4o",
-        "tag_ids": [tag_id],
-        "kb_id": kb_id
-    }
-    prompt_response = client.post(
-        f"/v0/orgs/{org_id}/prompts",
-        json=prompt_data,
-        headers=get_auth_headers()
+    prompt_revid = create_prompt_api(
+        "KB Token Test Prompt",
+        "Extract information from this document.",
+        tag_id,
+        kb_id=kb_id,
     )
-    prompt_revid = prompt_response.json()["prompt_revid"]
-    
-    # Create document
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
-    upload_data = {
-        "documents": [{
-            "name": "test_doc.pdf",
-            "content": f"data:application/pdf;base64,{base64.b64encode(pdf_content).decode()}",
-            "tag_ids": [tag_id]
-        }]
-    }
-    upload_resp = client.post(f"/v0/orgs/{org_id}/documents", json=upload_data, headers=get_auth_headers())
-    document_id = upload_resp.json()["documents"][0]["document_id"]
-    
-    await seed_mock_ocr_for_unit_test(analytiq_client, document_id)
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
     
     # Mock KB search results
-    mock_kb_results = await create_mock_kb_search_results(3)
+    mock_kb_results = create_mock_kb_search_results(3)
     mock_kb_search = AsyncMock(return_value=mock_kb_results)
     
     # Create mock LLM responses with specific token counts
@@ -652,12 +718,8 @@ async def test_llm_with_kb_token_accumulation(mock_embedding, mock_get_model_inf
     
     with (
         patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
-        patch('analytiq_data.llm.llm._litellm_acreate_file_with_retry', new=mock_litellm_acreate_file_with_retry),
         patch('analytiq_data.kb.search.search_knowledge_base', new=mock_kb_search),
         patch('analytiq_data.payments.record_spu_usage', new=mock_record_spu),
-        patch('litellm.completion_cost', return_value=0.001),
-        patch('litellm.supports_response_schema', return_value=True),
-        patch('litellm.utils.supports_pdf_input', return_value=True),
         patch('litellm.supports_function_calling', return_value=True),
     ):
         # Run LLM
@@ -691,35 +753,13 @@ async def test_llm_with_kb_no_kb_id(test_db, mock_auth, setup_test_models):
     )
     tag_id = tag_response.json()["id"]
     
-    # Create prompt without KB
-    prompt_data = {
-        "name": "No KB Test Prompt",
-        "content": "Extract information from this document.",
-        "model": "gpt-4o",
-        "tag_ids": [tag_id]
-        # No kb_id
-    }
-    prompt_response = client.post(
-        f"/v0/orgs/{org_id}/prompts",
-        json=prompt_data,
-        headers=get_auth_headers()
+    prompt_revid = create_prompt_api(
+        "No KB Test Prompt",
+        "Extract information from this document.",
+        tag_id,
     )
-    prompt_revid = prompt_response.json()["prompt_revid"]
-    
-    # Create document
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
-    upload_data = {
-        "documents": [{
-            "name": "test_doc.pdf",
-            "content": f"data:application/pdf;base64,{base64.b64encode(pdf_content).decode()}",
-            "tag_ids": [tag_id]
-        }]
-    }
-    upload_resp = client.post(f"/v0/orgs/{org_id}/documents", json=upload_data, headers=get_auth_headers())
-    document_id = upload_resp.json()["documents"][0]["document_id"]
-    
     analytiq_client = ad.common.get_analytiq_client()
-    await seed_mock_ocr_for_unit_test(analytiq_client, document_id)
+    document_id = await upload_seeded_document(analytiq_client, tag_id)
     
     # Mock LLM response (no tool calls)
     final_response = MockLLMResponseWithToolCalls(
@@ -733,11 +773,7 @@ async def test_llm_with_kb_no_kb_id(test_db, mock_auth, setup_test_models):
     
     with (
         patch('analytiq_data.llm.llm._litellm_acompletion_with_retry', new=mock_acompletion),
-        patch('analytiq_data.llm.llm._litellm_acreate_file_with_retry', new=mock_litellm_acreate_file_with_retry),
         patch('analytiq_data.kb.search.search_knowledge_base', new=mock_kb_search),
-        patch('litellm.completion_cost', return_value=0.001),
-        patch('litellm.supports_response_schema', return_value=True),
-        patch('litellm.utils.supports_pdf_input', return_value=True),
         patch('litellm.supports_function_calling', return_value=True),
     ):
         # Run LLM
@@ -1,10 +1,12 @@
 """Tests for OCR blocks endpoint format parameter (plain vs gzip)."""
 import gzip
 import json
+import pickle
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
+import analytiq_data as ad
 from tests.conftest_utils import client, get_token_headers
 
 
@@ -22,6 +24,11 @@ SAMPLE_OCR_PAGES_MARKDOWN = {
 SAMPLE_DOC = {"user_file_name": "test.pdf", "organization_id": "org-123"}
 
 
+def _json_bytes(data) -> bytes:
+    """OCR JSON as stored in GridFS (see ad.ocr.save_ocr_json)."""
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
 @pytest.mark.asyncio
 async def test_ocr_blocks_format_plain(org_and_users, test_db):
     """format=plain returns raw JSON with Cache-Control."""
@@ -31,7 +38,7 @@ async def test_ocr_blocks_format_plain(org_and_users, test_db):
 
     with (
         patch("app.routes.ocr.ad.common.get_doc", new_callable=AsyncMock, return_value=SAMPLE_DOC),
-        patch("app.routes.ocr.ad.ocr.get_ocr_json", new_callable=AsyncMock, return_value=SAMPLE_OCR_JSON),
+        patch("app.routes.ocr.ad.ocr.get_ocr_json_bytes", new_callable=AsyncMock, return_value=_json_bytes(SAMPLE_OCR_JSON)),
     ):
         resp = client.get(
             f"/v0/orgs/{org_id}/ocr/download/json/{doc_id}",
@@ -56,7 +63,7 @@ async def test_ocr_blocks_format_gzip(org_and_users, test_db):
         patch("app.routes.ocr.ad") as mock_ad,
     ):
         mock_ad.common.get_doc = AsyncMock(return_value=SAMPLE_DOC)
-        mock_ad.ocr.get_ocr_json = AsyncMock(return_value=SAMPLE_OCR_JSON)
+        mock_ad.ocr.get_ocr_json_bytes = AsyncMock(return_value=_json_bytes(SAMPLE_OCR_JSON))
         mock_ad.common.get_analytiq_client = lambda: None
         mock_ad.common.doc.ocr_supported = lambda fn: fn.endswith(".pdf")
 
@@ -88,7 +95,7 @@ async def test_ocr_blocks_format_default_is_plain(org_and_users, test_db):
 
     with (
         patch("app.routes.ocr.ad.common.get_doc", new_callable=AsyncMock, return_value=SAMPLE_DOC),
-        patch("app.routes.ocr.ad.ocr.get_ocr_json", new_callable=AsyncMock, return_value=SAMPLE_OCR_JSON),
+        patch("app.routes.ocr.ad.ocr.get_ocr_json_bytes", new_callable=AsyncMock, return_value=_json_bytes(SAMPLE_OCR_JSON)),
     ):
         resp = client.get(
             f"/v0/orgs/{org_id}/ocr/download/json/{doc_id}",
@@ -109,9 +116,9 @@ async def test_ocr_blocks_textract_envelope_returned_as_stored(org_and_users, te
     with (
         patch("app.routes.ocr.ad.common.get_doc", new_callable=AsyncMock, return_value=SAMPLE_DOC),
         patch(
-            "app.routes.ocr.ad.ocr.get_ocr_json",
+            "app.routes.ocr.ad.ocr.get_ocr_json_bytes",
             new_callable=AsyncMock,
-            return_value=SAMPLE_OCR_TEXTRACT_ENVELOPE,
+            return_value=_json_bytes(SAMPLE_OCR_TEXTRACT_ENVELOPE),
         ),
     ):
         resp = client.get(
@@ -148,9 +155,9 @@ async def test_ocr_download_blocks_pages_markdown_returns_native_payload(org_and
     with (
         patch("app.routes.ocr.ad.common.get_doc", new_callable=AsyncMock, return_value=SAMPLE_DOC),
         patch(
-            "app.routes.ocr.ad.ocr.get_ocr_json",
+            "app.routes.ocr.ad.ocr.get_ocr_json_bytes",
             new_callable=AsyncMock,
-            return_value=SAMPLE_OCR_PAGES_MARKDOWN,
+            return_value=_json_bytes(SAMPLE_OCR_PAGES_MARKDOWN),
         ),
     ):
         resp = client.get(
@@ -160,3 +167,22 @@ async def test_ocr_download_blocks_pages_markdown_returns_native_payload(org_and
         )
     assert resp.status_code == 200
     assert resp.json() == SAMPLE_OCR_PAGES_MARKDOWN
+
+
+@pytest.mark.asyncio
+async def test_get_ocr_json_bytes_serves_json_blob_as_stored():
+    """JSON blobs are returned byte-for-byte; legacy pickle blobs are re-encoded as JSON."""
+    stored = b'[{"BlockType": "LINE", "Text": "Sample line"}]'
+    with patch("analytiq_data.mongodb.get_blob_async", new_callable=AsyncMock, return_value={"blob": stored}):
+        assert await ad.ocr.get_ocr_json_bytes(None, "507f1f77bcf86cd799439011") is stored
+
+    with patch(
+        "analytiq_data.mongodb.get_blob_async",
+        new_callable=AsyncMock,
+        return_value={"blob": pickle.dumps(SAMPLE_OCR_JSON)},
+    ):
+        body = await ad.ocr.get_ocr_json_bytes(None, "507f1f77bcf86cd799439011")
+    assert json.loads(body) == SAMPLE_OCR_JSON
+
+    with patch("analytiq_data.mongodb.get_blob_async", new_callable=AsyncMock, return_value=None):
+        assert await ad.ocr.get_ocr_json_bytes(None, "507f1f77bcf86cd799439011") is None